@@ -0,0 +1,77 @@
+"""
+Fast JSON encoding and decoding of the API.
+
+Uses orjson when it is installed and the standard json module otherwise. Values orjson does not handle natively
+or handles differently, such as Decimal, datetime, date, time, UUID and lazy translation strings, are converted
+by the encoder of the rest_framework package, so both backends produce the same documents as DRF's JSONRenderer.
+"""
+import json
+from typing import Any, Optional, Union
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard json module is used without it
+    orjson = None
+
+_encoder: JSONEncoder = JSONEncoder()
+ORJSON_OPTIONS: int = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps(data: Any) -> bytes:
+    """
+    The dumps function takes as an argument the data to encode. Returns the compact UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def loads(document: Union[bytes, str]) -> Any:
+    """
+    The loads function takes as an argument a JSON document. Returns the decoded data,
+    raises a ValueError if the document is malformed.
+    """
+    if orjson is not None:
+        return orjson.loads(document)
+    return json.loads(document)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    The FastJSONRenderer class inherits from the JSONRenderer class from rest_framework.renderers.
+    Renders compact responses with the fast encoder. Responses with an indent requested
+    in the Accept header are rendered by the parent class.
+    """
+    def render(self, data, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> bytes:
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        document: bytes = dumps(data)
+        if b"\xe2\x80\xa8" in document or b"\xe2\x80\xa9" in document:
+            document = document.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return document
+
+
+class FastJSONParser(JSONParser):
+    """
+    The FastJSONParser class inherits from the JSONParser class from rest_framework.parsers.
+    Parses the request body with the fast decoder.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        The parse function overrides the base class method. It takes as arguments a request stream, a media type
+        and a parser context. Raises a ParseError exception if the body is malformed. Returns the decoded data.
+        """
+        encoding: str = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body: bytes = stream.read()
+            return loads(body if encoding.lower().replace("-", "") == "utf8" else body.decode(encoding))
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
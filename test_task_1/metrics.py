@@ -0,0 +1,187 @@
+"""
+In-process performance metrics of the project.
+
+Every request handled by PerformanceMiddleware gets a RequestRecorder kept in a context variable. The SQL
+execute wrapper and TimedSerializerMixin below add to the recorder of the current request, so they work
+for sync views, async views and the threads async views run the ORM in. Finished requests of the
+instrumented apps are aggregated by the METRICS registry into latency histograms and slow-query samples.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+LATENCY_BUCKETS_MS: List[float] = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class RequestRecorder:
+    """
+    The RequestRecorder class collects the timings of one request: the number of SQL queries, the time spent
+    in the database and in serializers, and the queries slower than the slow query threshold.
+    """
+    __slots__ = ("started", "queries", "db_time", "serializer_time", "serializing", "slow_queries")
+
+    def __init__(self) -> None:
+        self.started: float = time.perf_counter()
+        self.queries: int = 0
+        self.db_time: float = 0.0
+        self.serializer_time: float = 0.0
+        self.serializing: bool = False
+        self.slow_queries: List[dict] = []
+
+
+current_recorder: ContextVar[Optional[RequestRecorder]] = ContextVar("current_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    The record_query function is a database execute wrapper. Times every query run while a request
+    is being recorded and keeps the slow ones as samples. Returns the result of the query.
+    """
+    recorder: Optional[RequestRecorder] = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started: float = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration: float = time.perf_counter() - started
+        recorder.queries += 1
+        recorder.db_time += duration
+        if duration * 1000 >= getattr(settings, "PERFORMANCE_SLOW_QUERY_MS", 100):
+            recorder.slow_queries.append({"sql": sql[:1000], "duration_ms": round(duration * 1000, 3)})
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """
+    The install_query_recorder function adds the record_query wrapper to a database connection once.
+    It is connected to the connection_created signal and is also called for already open connections.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """
+    The TimedSerializerMixin class is a mixin for the serializers of the project that render responses.
+    Adds the time of the outermost to_representation call to the recorder of the current request, so nested
+    serializers and list items are counted once. Does nothing outside of recorded requests.
+    """
+    def to_representation(self, instance):
+        recorder: Optional[RequestRecorder] = current_recorder.get()
+        if recorder is None or recorder.serializing:
+            return super().to_representation(instance)
+        recorder.serializing = True
+        started: float = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            recorder.serializer_time += time.perf_counter() - started
+            recorder.serializing = False
+
+
+class ViewMetrics:
+    """
+    The ViewMetrics class aggregates the finished requests of one view: a latency histogram and the totals
+    of latency, queries, database and serializer time.
+    """
+    def __init__(self) -> None:
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self.queries: int = 0
+        self.db_ms: float = 0.0
+        self.serializer_ms: float = 0.0
+
+    def add(self, latency_ms: float, recorder: RequestRecorder, status_code: int) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.errors += status_code >= 500
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.queries += recorder.queries
+        self.db_ms += recorder.db_time * 1000
+        self.serializer_ms += recorder.serializer_time * 1000
+
+    def percentile(self, share: float) -> Optional[float]:
+        """
+        The percentile function takes as an argument a share between 0 and 1. Returns the upper bound
+        of the histogram bucket the percentile falls into, or None for the overflow bucket.
+        """
+        rank: float = share * self.count
+        seen: int = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self) -> dict:
+        count: int = self.count or 1
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency_ms": {"avg": self.total_ms / count, "max": self.max_ms,
+                           "p50": self.percentile(0.5), "p99": self.percentile(0.99)},
+            "queries_avg": self.queries / count,
+            "db_ms_avg": self.db_ms / count,
+            "serializer_ms_avg": self.serializer_ms / count,
+            "histogram_ms": dict(zip([*map(str, LATENCY_BUCKETS_MS), "+Inf"], self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry class keeps the metrics of all instrumented views of the process
+    and a bounded sample of the slowest queries.
+    """
+    def __init__(self, slow_query_samples: int = 100) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.views: Dict[str, ViewMetrics] = {}
+        self.slow_queries: Deque[dict] = deque(maxlen=slow_query_samples)
+
+    def add(self, view: str, latency_ms: float, recorder: RequestRecorder, status_code: int) -> None:
+        with self.lock:
+            self.views.setdefault(view, ViewMetrics()).add(latency_ms, recorder, status_code)
+            for query in recorder.slow_queries:
+                self.slow_queries.append({"view": view, **query})
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "views": {view: metrics.as_dict() for view, metrics in sorted(self.views.items())},
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.views.clear()
+            self.slow_queries.clear()
+
+
+METRICS: MetricsRegistry = MetricsRegistry()
+
+
+class MetricsView(APIView):
+    """
+    The MetricsView class inherits from the APIView class from the rest_framework.views module and is
+    a class-based view for processing requests with GET and DELETE methods at the address '/metrics'.
+    Shows or resets the in-process performance metrics, available to staff users only.
+    """
+    permission_classes: list = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        return Response(METRICS.snapshot())
+
+    def delete(self, request, *args, **kwargs) -> Response:
+        METRICS.reset()
+        return Response(status=204)
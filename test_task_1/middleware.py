@@ -0,0 +1,217 @@
+import time
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import FileResponse
+
+from test_task_1.metrics import (
+    METRICS, RequestRecorder, current_recorder, install_query_recorder
+)
+from test_task_1.routers import RoutingState, current_state, pin_to_primary
+
+
+class PerformanceMiddleware:
+    """
+    The PerformanceMiddleware class records the latency, the number of SQL queries, the database time
+    and the serializer time of every request to the apps listed in PERFORMANCE_METRICS_APPS. It adds them
+    to the response as the Server-Timing header and to the in-process metrics shown at '/metrics'.
+    Works for sync and async views alike.
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.apps: Tuple[str, ...] = tuple(getattr(settings, "PERFORMANCE_METRICS_APPS", ("trade_network", "user")))
+        connection_created.connect(install_query_recorder, dispatch_uid="performance_query_recorder")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.install_on_open_connections()
+        recorder: RequestRecorder = RequestRecorder()
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder: RequestRecorder = RequestRecorder()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    def install_on_open_connections(self) -> None:
+        """
+        The install_on_open_connections function adds the query recorder to the connections of the current
+        thread that were opened before the middleware was created.
+        """
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def view_name(self, request) -> Optional[str]:
+        """
+        The view_name function takes as an argument the request object. Returns the dotted path of the view
+        that handled the request if it belongs to an instrumented app, otherwise None.
+        """
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return None
+        view = getattr(match.func, "view_class", match.func)
+        path: str = f"{view.__module__}.{view.__qualname__}"
+        return path if path.startswith(tuple(f"{app}." for app in self.apps)) else None
+
+    def finish(self, request, response, recorder: RequestRecorder):
+        """
+        The finish function takes as arguments the request object, the response and the recorder
+        of the request. Adds the Server-Timing header and the request to the metrics. Streaming responses
+        other than files run their queries while the body is sent, so they get no header and are added
+        to the metrics when the body is exhausted. Returns the response.
+        """
+        view: Optional[str] = self.view_name(request)
+        if view is None:
+            return response
+        if response.streaming and not isinstance(response, FileResponse):
+            stream = self.record_async_stream if response.is_async else self.record_stream
+            response.streaming_content = stream(response.streaming_content, view, response, recorder)
+            return response
+        latency_ms: float = (time.perf_counter() - recorder.started) * 1000
+        response["Server-Timing"] = (
+            f"total;dur={latency_ms:.2f}, "
+            f'db;dur={recorder.db_time * 1000:.2f};desc="{recorder.queries} queries", '
+            f"serializer;dur={recorder.serializer_time * 1000:.2f}"
+        )
+        METRICS.add(view, latency_ms, recorder, response.status_code)
+        return response
+
+    def record_stream(self, content: Iterator, view: str, response, recorder: RequestRecorder) -> Iterator:
+        """
+        The record_stream function takes as arguments the body of a streaming response, the view name,
+        the response and the recorder of the request. Yields the body with the recorder set while every chunk
+        is produced and adds the request to the metrics once the body is sent or the client goes away.
+        """
+        content = iter(content)
+        try:
+            while True:
+                token = current_recorder.set(recorder)
+                try:
+                    chunk = next(content)
+                except StopIteration:
+                    return
+                finally:
+                    current_recorder.reset(token)
+                yield chunk
+        finally:
+            METRICS.add(view, (time.perf_counter() - recorder.started) * 1000, recorder, response.status_code)
+
+    async def record_async_stream(self, content: AsyncIterator, view: str, response,
+                                  recorder: RequestRecorder) -> AsyncIterator:
+        """
+        The record_async_stream function is the record_stream function for the async iterators
+        of streaming responses.
+        """
+        content = content.__aiter__()
+        try:
+            while True:
+                token = current_recorder.set(recorder)
+                try:
+                    chunk = await content.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_recorder.reset(token)
+                yield chunk
+        finally:
+            METRICS.add(view, (time.perf_counter() - recorder.started) * 1000, recorder, response.status_code)
+
+
+class ReadReplicaMiddleware:
+    """
+    The ReadReplicaMiddleware class gives every request its own replica routing state. Reads go to the primary
+    unless the view allows replica reads. When the request has written to the primary, its user is pinned
+    to the primary for REPLICA_PIN_SECONDS, so the following requests of the user read their own writes.
+    Works for sync and async views alike.
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state: RoutingState = RoutingState()
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        self.finish(request, state)
+        return response
+
+    async def __acall__(self, request):
+        state: RoutingState = RoutingState()
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        self.finish(request, state)
+        return response
+
+    def finish(self, request, state: RoutingState) -> None:
+        """
+        The finish function takes as arguments the request object and its routing state.
+        Pins the user of the request to the primary if the request has written anything.
+        """
+        user = getattr(request, "user", None)
+        if state.wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+
+
+class RateLimitMiddleware:
+    """
+    The RateLimitMiddleware class adds the RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset headers
+    to the responses of throttled views, taken from the most restrictive token bucket of the request.
+    Works for sync and async views alike.
+    """
+    sync_capable: bool = True
+    async_capable: bool = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.finish(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.finish(request, await self.get_response(request))
+
+    def finish(self, request, response):
+        """
+        The finish function takes as arguments the request object and the response. Adds the RateLimit
+        headers of the token bucket recorded on the request. Returns the response.
+        """
+        rate_limit: Optional[Tuple[int, int, int]] = getattr(request, "rate_limit", None)
+        if rate_limit is not None:
+            response["RateLimit-Limit"], response["RateLimit-Remaining"], response["RateLimit-Reset"] = map(
+                str, rate_limit
+            )
+        return response
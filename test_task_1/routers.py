@@ -0,0 +1,123 @@
+"""
+Read-replica routing of the project.
+
+Reads go to the primary database unless the current request explicitly allows replica reads: the read-heavy
+GET endpoints and the admin changelists do so through allow_replica_reads(), which stays in effect
+until the end of the request, so lazily rendered responses read from the same database. A request that writes
+anything pins its user to the primary for REPLICA_PIN_SECONDS, so the user reads their own writes even if
+the replicas lag behind. The pins are kept in REPLICA_PIN_CACHE, which the settings require to be shared
+when several workers serve the requests of one user. Management commands, shells and transactions always use
+the primary.
+"""
+import random
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import permissions
+
+PIN_KEY: str = "replica:pin:{}"
+
+
+class RoutingState:
+    """
+    The RoutingState class holds the routing decisions of one request: whether its reads may go
+    to a replica and whether it has written to the primary.
+    """
+    __slots__ = ("replica_reads", "wrote")
+
+    def __init__(self) -> None:
+        self.replica_reads: bool = False
+        self.wrote: bool = False
+
+
+current_state: ContextVar[Optional[RoutingState]] = ContextVar("current_routing_state", default=None)
+
+
+def get_replicas() -> List[str]:
+    """
+    The get_replicas function returns the aliases of the read replicas listed by the READ_REPLICAS setting.
+    """
+    return list(getattr(settings, "READ_REPLICAS", []))
+
+
+def _pin_cache():
+    return caches[getattr(settings, "REPLICA_PIN_CACHE", "default")]
+
+
+def pin_to_primary(user_id) -> None:
+    """
+    The pin_to_primary function takes as an argument the primary key of a user. Sends the reads
+    of the user to the primary for the next REPLICA_PIN_SECONDS seconds.
+    """
+    _pin_cache().set(PIN_KEY.format(user_id), True, getattr(settings, "REPLICA_PIN_SECONDS", 5))
+
+
+def is_pinned(user_id) -> bool:
+    """
+    The is_pinned function takes as an argument the primary key of a user. Returns True if the user
+    has written recently and must read from the primary.
+    """
+    return user_id is not None and bool(_pin_cache().get(PIN_KEY.format(user_id)))
+
+
+def allow_replica_reads(user) -> bool:
+    """
+    The allow_replica_reads function takes as an argument the user of the current request. Lets the rest
+    of the request read from a replica unless there are no replicas or the user is pinned to the primary.
+    Returns True if replica reads were allowed.
+    """
+    state: Optional[RoutingState] = current_state.get()
+    if state is None or state.wrote or not get_replicas() or is_pinned(getattr(user, "pk", None)):
+        return False
+    state.replica_reads = True
+    return True
+
+
+def reading_from_replica() -> bool:
+    """
+    The reading_from_replica function returns True if the reads of the current request go to a replica.
+    """
+    state: Optional[RoutingState] = current_state.get()
+    return state is not None and state.replica_reads and not state.wrote and bool(get_replicas())
+
+
+class PrimaryReplicaRouter:
+    """
+    The PrimaryReplicaRouter class is the database router of the project. Sends writes to the primary
+    and reads to a random replica when the current request allows it. Reads inside a transaction
+    on the primary stay on the primary.
+    """
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if not reading_from_replica() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(get_replicas())
+
+    def db_for_write(self, model, **hints) -> str:
+        state: Optional[RoutingState] = current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints) -> bool:
+        return db not in get_replicas()
+
+
+class ReplicaReadMixin:
+    """
+    The ReplicaReadMixin class is a mixin for the read-heavy API views. Lets the safe requests of the view
+    read from a replica once the user is authenticated, unless the user has written recently.
+    """
+    def initial(self, request, *args, **kwargs) -> None:
+        """
+        The initial function overrides the method of the parent class. Allows replica reads
+        for GET and HEAD requests after authentication and permission checks.
+        """
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS:
+            allow_replica_reads(request.user)
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+from itertools import zip_longest
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 
@@ -52,6 +54,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'test_task_1.middleware.PerformanceMiddleware',
+    'test_task_1.middleware.ReadReplicaMiddleware',
+    'test_task_1.middleware.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,10 +100,102 @@ DATABASES = {
         'PASSWORD': os.environ.get("DB_PASSWORD"),
         'HOST': os.environ.get("DB_HOST"),
         'PORT': os.environ.get("DB_PORT"),
+        'CONN_HEALTH_CHECKS': os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() in ("1", "true", "yes"),
+    }
+}
+
+# Connection reuse. DB_POOL=pgbouncer is the pooled mode: the application connects to a local PgBouncer
+# in transaction pooling mode, which keeps the TLS-authenticated connections to PostgreSQL open, so server-side
+# cursors are disabled. Under ASGI the views run in changing threads and Django cannot close their idle
+# connections, so persistent connections are off there by default and the pooled mode should be used instead.
+# DB_CONN_MAX_AGE overrides the default lifetime of a connection in seconds, 0 closes it after every request.
+
+DB_POOL = os.environ.get("DB_POOL", "none")
+SERVER_INTERFACE = os.environ.get("DJANGO_SERVER_INTERFACE", "wsgi")
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get(
+    "DB_CONN_MAX_AGE", 0 if SERVER_INTERFACE == "asgi" or DB_POOL == "pgbouncer" else 60
+))
+if DB_POOL == "pgbouncer":
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+if 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default']['OPTIONS'] = {
+        'connect_timeout': int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+        'keepalives': 1,
+        'keepalives_idle': int(os.environ.get("DB_KEEPALIVES_IDLE", 60)),
+    }
+
+# Read replicas: DB_REPLICA_HOSTS and DB_REPLICA_NAMES are comma-separated lists, a missing host or name
+# is taken from the primary, e.g. DB_REPLICA_NAMES=replica.sqlite3 for a local SQLite setup.
+# Tests run the replicas as mirrors of the primary.
+
+READ_REPLICAS = []
+for index, (replica_host, replica_name) in enumerate(zip_longest(
+        [host for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if host],
+        [name for name in os.environ.get("DB_REPLICA_NAMES", "").split(",") if name])):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host or DATABASES['default']['HOST'],
+        'NAME': replica_name or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['test_task_1.routers.PrimaryReplicaRouter']
+REPLICA_PIN_CACHE = 'default'
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
 
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("CACHE_LOCATION", 'test_task_1'),
     }
 }
 
+TRADE_NETWORK_CACHE = 'default'
+TRADE_NETWORK_CACHE_TIMEOUT = int(os.environ.get("TRADE_NETWORK_CACHE_TIMEOUT", 300))
+
+TOKEN_CACHE = 'default'
+TOKEN_CACHE_TIMEOUT = int(os.environ.get("TOKEN_CACHE_TIMEOUT", 300))
+
+# Caches whose entries every worker process must see. With more than one worker (WEB_CONCURRENCY, which gunicorn
+# and uvicorn also read) they must not be the process-local LocMemCache.
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+SHARED_CACHES = {'TRADE_NETWORK_CACHE': TRADE_NETWORK_CACHE, 'TOKEN_CACHE': TOKEN_CACHE}
+if READ_REPLICAS:
+    SHARED_CACHES['REPLICA_PIN_CACHE'] = REPLICA_PIN_CACHE
+LOCAL_CACHES = [setting for setting, alias in SHARED_CACHES.items()
+                if CACHES[alias]['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache']
+if WEB_CONCURRENCY > 1 and LOCAL_CACHES:
+    raise ImproperlyConfigured(
+        f"{', '.join(LOCAL_CACHES)} use the process-local LocMemCache, which the {WEB_CONCURRENCY} workers "
+        f"do not share. Set CACHE_BACKEND to a shared cache such as Redis or Memcached."
+    )
+
+
+# Background jobs
+
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 2))
+JOB_RETRY_DELAY = int(os.environ.get("JOB_RETRY_DELAY", 30))
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 600))
+JOB_EXPORT_DIR = Path(os.environ.get("JOB_EXPORT_DIR", BASE_DIR / 'exports'))
+DEBT_CLEAR_CHUNK_SIZE = int(os.environ.get("DEBT_CLEAR_CHUNK_SIZE", 500))
+DEBT_CLEAR_PAUSE = float(os.environ.get("DEBT_CLEAR_PAUSE", 0))
+
+
+# Change feed
+
+CHANGE_FEED_LAG_SECONDS = int(os.environ.get("CHANGE_FEED_LAG_SECONDS", 30))
+
+
+# Performance metrics
+
+PERFORMANCE_METRICS_APPS = ('trade_network', 'user')
+PERFORMANCE_SLOW_QUERY_MS = int(os.environ.get("PERFORMANCE_SLOW_QUERY_MS", 100))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -121,12 +218,37 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'user.authentication.BearerTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication'
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'test_task_1.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'test_task_1.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'test_task_1.throttling.ClientThrottle',
+        'test_task_1.throttling.ScopedThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.environ.get("THROTTLE_USER_RATE", "1200/min"),
+        'anon': os.environ.get("THROTTLE_ANON_RATE", "120/min"),
+        'login': os.environ.get("THROTTLE_LOGIN_RATE", "20/min"),
+        'signup': os.environ.get("THROTTLE_SIGNUP_RATE", "20/hour"),
+        'list': os.environ.get("THROTTLE_LIST_RATE", "300/min"),
+    },
+    'NUM_PROXIES': int(os.environ["NUM_PROXIES"]) if os.environ.get("NUM_PROXIES") else None,
 }
 
+THROTTLE_ENABLED = os.environ.get("THROTTLE_ENABLED", "true").lower() in ("1", "true", "yes")
+THROTTLE_CACHE = 'default'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
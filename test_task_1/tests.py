@@ -0,0 +1,239 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.base import BaseHandler
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from test_task_1 import fastjson, routers, throttling
+from test_task_1.metrics import METRICS
+from trade_network.models import Node
+from user.models import User
+
+
+class PerformanceMiddlewareTest(TestCase):
+    """
+    The PerformanceMiddlewareTest class checks the Server-Timing header and the in-process metrics endpoint.
+    """
+    def setUp(self) -> None:
+        METRICS.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="admin", is_staff=True))
+        Node.objects.create(name="factory", level=0)
+
+    def test_server_timing_and_metrics(self) -> None:
+        response = self.client.get("/trade_network/node/list", {"limit": 10})
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+        views: dict = self.client.get("/metrics").data["views"]
+        metrics: dict = views["trade_network.views.NodeListView"]
+        self.assertEqual((metrics["count"], metrics["queries_avg"]), (1, 2))
+        self.assertGreater(metrics["serializer_ms_avg"], 0)
+        self.assertNotIn("test_task_1.metrics.MetricsView", views)
+
+    def test_streaming_response_recorded_when_sent(self) -> None:
+        response = self.client.get("/trade_network/node/export")
+        self.assertNotIn("Server-Timing", response)
+        self.assertNotIn("trade_network.views.NodeExportView", METRICS.snapshot()["views"])
+
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 1)
+        metrics: dict = METRICS.snapshot()["views"]["trade_network.views.NodeExportView"]
+        self.assertEqual(metrics["count"], 1)
+        self.assertGreaterEqual(metrics["queries_avg"], 1)
+
+    def test_metrics_require_staff(self) -> None:
+        self.client.force_authenticate(User.objects.create(username="staff"))
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+class ReadReplicaRoutingTest(TransactionTestCase):
+    """
+    The ReadReplicaRoutingTest class checks that safe requests of the read-heavy views go to a replica
+    and that writes, transactions and the requests of recently writing users stay on the primary.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create(username="staff", is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.node = Node.objects.create(name="factory", level=0)
+
+    @override_settings(READ_REPLICAS=["replica_0"])
+    def test_router_decisions(self) -> None:
+        router = routers.PrimaryReplicaRouter()
+        token = routers.current_state.set(routers.RoutingState())
+        try:
+            self.assertEqual(router.db_for_read(Node), "default")
+            self.assertTrue(routers.allow_replica_reads(self.user))
+            self.assertEqual(router.db_for_read(Node), "replica_0")
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Node), "default")
+
+            self.assertEqual(router.db_for_write(Node), "default")
+            self.assertEqual(router.db_for_read(Node), "default")
+            self.assertFalse(router.allow_migrate("replica_0", "trade_network"))
+        finally:
+            routers.current_state.reset(token)
+
+        routers.pin_to_primary(self.user.pk)
+        token = routers.current_state.set(routers.RoutingState())
+        try:
+            self.assertFalse(routers.allow_replica_reads(self.user))
+        finally:
+            routers.current_state.reset(token)
+
+    @override_settings(READ_REPLICAS=["default"])
+    def test_read_your_writes(self) -> None:
+        with mock.patch("test_task_1.routers.random.choice", wraps=routers.random.choice) as choice:
+            self.assertEqual(self.client.get(f"/trade_network/node/{self.node.pk}").status_code, 200)
+            self.assertTrue(choice.called)
+
+            choice.reset_mock()
+            response = self.client.patch(f"/trade_network/node/{self.node.pk}", {"name": "plant"}, format="json")
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(choice.called)
+            self.assertTrue(routers.is_pinned(self.user.pk))
+
+            response = self.client.get("/trade_network/node/list", {"limit": 10})
+            self.assertEqual(response.data["results"][0]["name"], "plant")
+            self.assertFalse(choice.called)
+
+
+class FastJSONTest(TestCase):
+    """
+    The FastJSONTest class checks that the fast renderer and parser produce the same data as the DRF ones,
+    with and without the optional accelerator.
+    """
+    DATA: dict = {
+        "debt": Decimal("12.50"),
+        "created": datetime(2023, 5, 1, 10, 30, 15, 123456, tzinfo=timezone.utc),
+        "name": "Завод \u2028",
+        "levels": {0: "factory"},
+    }
+
+    def check_backend(self) -> None:
+        document: bytes = fastjson.FastJSONRenderer().render(self.DATA)
+        self.assertEqual(json.loads(document), json.loads(JSONRenderer().render(self.DATA)))
+        self.assertNotIn(b"\xe2\x80\xa8", document)
+
+        parsed = fastjson.FastJSONParser().parse(io.BytesIO(document), parser_context={})
+        self.assertEqual((parsed["created"], parsed["debt"]), ("2023-05-01T10:30:15.123456Z", 12.5))
+
+    def test_accelerated(self) -> None:
+        self.assertIsNotNone(fastjson.orjson)
+        self.check_backend()
+
+    def test_stdlib_fallback(self) -> None:
+        with mock.patch("test_task_1.fastjson.orjson", None):
+            self.check_backend()
+
+    def test_api_uses_fast_backend(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        response = client.post("/trade_network/node", b'{"name": "plant"', content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.post("/trade_network/node", {"name": "plant"}, format="json").status_code, 201)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {
+    "user": "5/min", "anon": "100/min", "login": "2/min", "list": "3/min",
+}})
+class RateLimitTest(TestCase):
+    """
+    The RateLimitTest class checks the token bucket throttling of the API and its RateLimit headers.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        throttling._local_cache.clear()
+        self.client = APIClient()
+        self.credentials: dict = {"username": "integration", "password": "wrong"}
+        User.objects.create_user(username="integration", password="Str0ng-passw0rd")
+
+    def test_login_budget_per_ip(self) -> None:
+        for remaining in (1, 0):
+            response = self.client.post("/user/login", self.credentials, format="json")
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual((response["RateLimit-Limit"], response["RateLimit-Remaining"]), ("2", str(remaining)))
+        response = self.client.post("/user/login", self.credentials, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+        response = self.client.post("/user/login", self.credentials, format="json", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_and_list_budgets(self) -> None:
+        self.client.force_authenticate(User.objects.get(username="integration"))
+        statuses: list = [self.client.get("/trade_network/node/list").status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        response = self.client.get("/user/profile")
+        self.assertEqual((response.status_code, response["RateLimit-Remaining"]), (200, "0"))
+        self.assertEqual(self.client.get("/user/profile").status_code, 429)
+
+    def test_refill(self) -> None:
+        now: float = time.time()
+        with mock.patch("test_task_1.throttling.time.time", return_value=now):
+            for _ in range(3):
+                self.client.post("/user/login", self.credentials, format="json")
+        with mock.patch("test_task_1.throttling.time.time", return_value=now + 30):
+            response = self.client.post("/user/login", self.credentials, format="json")
+        self.assertEqual((response.status_code, response["RateLimit-Remaining"]), (401, "0"))
+
+    def test_local_fallback(self) -> None:
+        broken = mock.Mock(**{"get.side_effect": ConnectionError, "set.side_effect": ConnectionError})
+        with self.assertLogs("test_task_1.throttling", "WARNING") as logs:
+            with mock.patch("test_task_1.throttling.caches", {"default": broken}):
+                statuses: list = [self.client.post("/user/login", self.credentials, format="json").status_code
+                                  for _ in range(3)]
+        self.assertEqual(statuses, [401, 401, 429])
+        self.assertEqual(len(logs.records), 1)
+
+        with self.assertLogs("test_task_1.throttling", "INFO") as logs:
+            self.client.post("/user/login", self.credentials, format="json")
+        self.assertEqual(logs.output, ["INFO:test_task_1.throttling:The throttle cache is available again."])
+
+    @override_settings(DEBUG=True)
+    def test_async_middleware_chain(self) -> None:
+        with self.assertNoLogs("django.request", "DEBUG"):
+            BaseHandler().load_middleware(is_async=True)
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self) -> None:
+        for _ in range(3):
+            response = self.client.post("/user/login", self.credentials, format="json")
+            self.assertEqual(response.status_code, 401)
+            self.assertNotIn("RateLimit-Limit", response)
+
+
+class SharedCacheSettingsTest(SimpleTestCase):
+    """
+    The SharedCacheSettingsTest class checks that the settings refuse to load when several workers
+    would use the process-local cache for data that all of them must see.
+    """
+    def load_settings(self, **environ: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-c", "from django.conf import settings; settings.CACHES"],
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "test_task_1.settings", **environ},
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+
+    def test_several_workers_need_shared_cache(self) -> None:
+        self.assertEqual(self.load_settings(WEB_CONCURRENCY="1").returncode, 0)
+        result = self.load_settings(WEB_CONCURRENCY="4")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("ImproperlyConfigured: TRADE_NETWORK_CACHE, TOKEN_CACHE use", result.stderr)
+        result = self.load_settings(WEB_CONCURRENCY="4", DB_REPLICA_NAMES="replica.sqlite3")
+        self.assertIn("TOKEN_CACHE, REPLICA_PIN_CACHE use", result.stderr)
+        result = self.load_settings(WEB_CONCURRENCY="4", CACHE_BACKEND="django.core.cache.backends.redis.RedisCache")
+        self.assertEqual(result.returncode, 0, result.stderr)
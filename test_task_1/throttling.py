@@ -0,0 +1,174 @@
+"""
+Rate limiting of the API.
+
+Every client has a token bucket per scope: the bucket holds up to N tokens, refills at N tokens per period
+and every request takes one token, so a client may burst up to N requests and is then limited to the average rate.
+Rates use the "N/period" format of the DEFAULT_THROTTLE_RATES of the rest_framework package. Authenticated clients
+are counted per user and anonymous ones per IP address. Views with an expensive handler name their own budget
+in throttle_scope, which applies on top of the per-client one.
+
+The buckets live in the cache named by THROTTLE_CACHE, so all workers share them. If that cache is unavailable,
+each process falls back to its own local-memory buckets rather than failing or letting every request through,
+and logs one warning per outage.
+Like the throttles of the rest_framework package, concurrent requests of one client may race on its bucket,
+which can let a few extra requests through but never blocks a client wrongly.
+"""
+import logging
+import math
+import time
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY: str = "throttle:{}:{}"
+PERIODS: dict = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_local_cache: LocMemCache = LocMemCache("throttle-fallback", {})
+_cache_down: bool = False
+
+
+def cache_failed() -> None:
+    """
+    The cache_failed function is called when the throttle cache raises an error. Logs a warning with the traceback
+    only for the first error since the cache last worked, so an outage does not log one warning per request.
+    """
+    global _cache_down
+    if not _cache_down:
+        _cache_down = True
+        logger.warning("The throttle cache is unavailable, using the local buckets.", exc_info=True)
+
+
+def cache_recovered() -> None:
+    """
+    The cache_recovered function is called when the throttle cache works. Logs that the cache is back
+    if it failed before, so the next outage is reported again.
+    """
+    global _cache_down
+    if _cache_down:
+        _cache_down = False
+        logger.info("The throttle cache is available again.")
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    The parse_rate function takes as an argument a rate such as "100/min". Returns the number of requests
+    and the period in seconds, or None if the rate is not set.
+    """
+    if not rate:
+        return None
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+def take_token(key: str, capacity: int, period: int) -> Tuple[bool, float]:
+    """
+    The take_token function takes as arguments the cache key of a bucket, its capacity and its refill period.
+    Refills the bucket for the time passed since its last use and takes one token if there is one.
+    Returns whether the request is allowed and the number of tokens left.
+    """
+    now: float = time.time()
+    rate: float = capacity / period
+    try:
+        cache = caches[getattr(settings, "THROTTLE_CACHE", "default")]
+        state = cache.get(key)
+    except Exception:
+        cache_failed()
+        cache, state = _local_cache, _local_cache.get(key)
+
+    tokens, stamp = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - stamp) * rate)
+    allowed: bool = tokens >= 1
+    if allowed:
+        tokens -= 1
+    try:
+        cache.set(key, (tokens, now), timeout=period)
+    except Exception:
+        cache_failed()
+        _local_cache.set(key, (tokens, now), timeout=period)
+    else:
+        if cache is not _local_cache:
+            cache_recovered()
+    return allowed, tokens
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    The TokenBucketThrottle class inherits from the BaseThrottle class from rest_framework.throttling.
+    Limits the requests of a client with a token bucket of the rate of its scope and records the state
+    of the bucket for the RateLimit headers. Does nothing when THROTTLE_ENABLED is off or the scope has no rate.
+    """
+    scope: Optional[str] = None
+
+    def get_scope(self, request, view) -> Optional[str]:
+        """
+        The get_scope function takes as arguments the request object and the view.
+        Returns the name of the budget that applies to the request.
+        """
+        return self.scope
+
+    def get_client(self, request) -> str:
+        """
+        The get_client function takes as an argument the request object. Returns the user primary key
+        for authenticated requests and the IP address for anonymous ones.
+        """
+        if request.user is not None and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view) -> bool:
+        """
+        The allow_request function overrides the base class method. It takes as arguments the request object
+        and the view. Takes a token from the bucket of the client. Returns False if the bucket is empty.
+        """
+        scope: Optional[str] = self.get_scope(request, view)
+        rate: Optional[Tuple[int, int]] = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope)) if scope else None
+        if rate is None or not getattr(settings, "THROTTLE_ENABLED", True):
+            return True
+
+        self.capacity, self.period = rate
+        allowed, self.tokens = take_token(BUCKET_KEY.format(scope, self.get_client(request)), *rate)
+        self.record(request)
+        return allowed
+
+    def wait(self) -> float:
+        """
+        The wait function overrides the base class method. Returns the number of seconds until the bucket
+        holds a token again.
+        """
+        return max(0.0, (1 - self.tokens) * self.period / self.capacity)
+
+    def record(self, request) -> None:
+        """
+        The record function takes as an argument the request object. Stores the limit, the remaining requests
+        and the seconds until the bucket is full on the underlying HttpRequest for RateLimitMiddleware, keeping
+        the most restrictive bucket when several apply.
+        """
+        remaining: int = math.floor(self.tokens)
+        current: Optional[Tuple[int, int, int]] = getattr(request._request, "rate_limit", None)
+        if current is None or remaining < current[1]:
+            reset: int = math.ceil((self.capacity - self.tokens) * self.period / self.capacity)
+            request._request.rate_limit = (self.capacity, remaining, reset)
+
+
+class ClientThrottle(TokenBucketThrottle):
+    """
+    The ClientThrottle class inherits from the TokenBucketThrottle class. Applies the "user" budget
+    to authenticated requests and the "anon" budget to anonymous ones.
+    """
+    def get_scope(self, request, view) -> Optional[str]:
+        return "user" if request.user is not None and request.user.is_authenticated else "anon"
+
+
+class ScopedThrottle(TokenBucketThrottle):
+    """
+    The ScopedThrottle class inherits from the TokenBucketThrottle class. Applies the budget named
+    by the throttle_scope attribute of the view, if the view has one.
+    """
+    def get_scope(self, request, view) -> Optional[str]:
+        return getattr(view, "throttle_scope", None)
@@ -17,9 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from test_task_1.metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('user/', include('user.urls')),
     path("trade_network/", include("trade_network.urls")),
+    path('metrics', MetricsView.as_view()),
 ]
\ No newline at end of file
@@ -12,5 +12,6 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_task_1.settings')
+os.environ.setdefault('DJANGO_SERVER_INTERFACE', 'wsgi')
 
 application = get_wsgi_application()
@@ -1,10 +1,81 @@
-from typing import Tuple, List, Union
+import hashlib
+from typing import Tuple, List, Optional, Union
+
+from django.conf import settings
 from django.contrib import admin
-from django.db import models
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.db import connections, models
 from django.db.models import QuerySet
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from django.urls import reverse
 from django.utils.html import format_html
 
-from trade_network.models import Node, Contact, Product
+from test_task_1.routers import allow_replica_reads
+from trade_network.cache import get_cache, network_version
+from trade_network.jobs import enqueue
+from trade_network.ledger import debt_summary
+from trade_network.models import Node, Contact, Product, DebtTransaction, Job
+
+
+class CachedCountPaginator(Paginator):
+    """
+    The CachedCountPaginator class inherits from the Paginator class from the django.core.paginator module.
+    Avoids an exact COUNT over large tables on every changelist page: an unfiltered changelist
+    on PostgreSQL uses the planner estimate once the table is larger than ADMIN_APPROXIMATE_COUNT_THRESHOLD,
+    any other count is cached until the trading network changes.
+    """
+    @cached_property
+    def count(self) -> int:
+        """
+        The count function overrides the property of the parent class. Returns the estimated or cached
+        number of objects in the changelist.
+        """
+        queryset: QuerySet = self.object_list
+        connection = connections[queryset.db]
+        threshold: int = getattr(settings, "ADMIN_APPROXIMATE_COUNT_THRESHOLD", 100000)
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                               [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row is not None and row[0] > threshold:
+                return int(row[0])
+
+        sql, params = queryset.query.sql_with_params()
+        key: str = "trade_network:count:" + hashlib.md5(f"{network_version()}:{sql}:{params}".encode()).hexdigest()
+        return get_cache().get_or_set(key, queryset.count, getattr(settings, "TRADE_NETWORK_CACHE_TIMEOUT", 300))
+
+
+class CityListFilter(admin.SimpleListFilter):
+    """
+    The CityListFilter class inherits from the SimpleListFilter class from the django.contrib.admin module.
+    Filters members of the trading network by the city of their contact. The list of distinct cities
+    is cached until the trading network changes instead of being computed on every page load.
+    """
+    title: str = "city"
+    parameter_name: str = "contact__city"
+
+    def lookups(self, request, model_admin) -> List[Tuple[str, str]]:
+        """
+        The lookups function overrides the method of the parent class. Returns the cached distinct cities.
+        """
+        cities: List[str] = get_cache().get_or_set(
+            f"trade_network:cities:{network_version()}",
+            lambda: list(Contact.objects.exclude(city=None).values_list("city", flat=True).distinct().order_by("city")),
+            getattr(settings, "TRADE_NETWORK_CACHE_TIMEOUT", 300),
+        )
+        return [(city, city) for city in cities]
+
+    def queryset(self, request, queryset: QuerySet) -> QuerySet:
+        """
+        The queryset function overrides the method of the parent class. Returns the queryset filtered
+        by the selected city.
+        """
+        if self.value():
+            return queryset.filter(contact__city=self.value())
+        return queryset
 
 
 class ContactInline(admin.TabularInline):
@@ -26,23 +97,65 @@ class ProductInline(admin.TabularInline):
     extra = 0
 
 
-class NodeAdmin(admin.ModelAdmin):
+class DebtTransactionInline(admin.TabularInline):
+    """
+    The DebtTransactionInline class inherits from the TabularInline base class from the django.contrib.admin module.
+    Shows the latest entries of the debt ledger on the page of a member of the trading network. The ledger
+    is append-only, so the entries cannot be changed or added here.
+    """
+    model: models.Model = DebtTransaction
+    fields: Tuple[str, ...] = ("created", "kind", "amount", "comment")
+    readonly_fields: Tuple[str, ...] = fields
+    ordering: Tuple[str, ...] = ("-id", )
+    extra = 0
+    max_num = 0
+    can_delete = False
+
+
+def selection_params(queryset: QuerySet) -> dict:
+    """
+    The selection_params function takes as an argument the queryset selected in the changelist.
+    Returns the job parameters of the selection: all members for an unfiltered selection of the whole table,
+    otherwise the list of the selected primary keys.
+    """
+    if not queryset.query.where:
+        return {"all": True}
+    return {"node_ids": list(queryset.values_list("id", flat=True))}
+
+
+class ReplicaChangelistMixin:
+    """
+    The ReplicaChangelistMixin class is a mixin for the model admins. Reads the changelist pages
+    from a replica when one is configured and the user has not written recently. Actions posted
+    to the changelist stay on the primary.
+    """
+    def changelist_view(self, request, extra_context=None):
+        if request.method == "GET":
+            allow_replica_reads(request.user)
+        return super().changelist_view(request, extra_context)
+
+
+class NodeAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     """
     The NodeAdmin class inherits from the ModelAdmin class. Defines the output of instance fields
     to the administration panel and the ability to edit them.
     """
-    inlines: List[admin.TabularInline] = [ContactInline, ProductInline,]
+    inlines: List[admin.TabularInline] = [ContactInline, ProductInline, DebtTransactionInline]
     list_display: Tuple[str, ...] = ("id", "name", "level", "to_supplier", "debt_to_the_supplier")
     list_display_links: Tuple[str, ...] = ('name', 'to_supplier')
-    list_filter: Tuple[str, ...] = ('contact__city', )
+    list_filter: Tuple[type, ...] = (CityListFilter, )
+    list_select_related: Tuple[str, ...] = ("supplier", )
+    autocomplete_fields: Tuple[str, ...] = ("supplier", )
+    paginator: type = CachedCountPaginator
+    show_full_result_count: bool = False
     fields: List[Union[Tuple[str, ...], str]] = [("id", "name"),
                                                  ("level", "supplier"),
                                                  "debt_to_the_supplier",
                                                  "date_of_creation"]
-    readonly_fields: Tuple[str, ...] = ("id", "date_of_creation",)
+    readonly_fields: Tuple[str, ...] = ("id", "level", "date_of_creation", "debt_to_the_supplier")
     search_fields: Tuple[str, ...] = ("name",)
     save_on_top: bool = True
-    actions: List[str] = ['clear_dept']
+    actions: List[str] = ['clear_dept', 'export_selected', 'rebuild_hierarchy']
 
     def to_supplier(self, obj: Node):
         """
@@ -53,32 +166,112 @@ class NodeAdmin(admin.ModelAdmin):
         if obj.supplier is not None:
             return format_html(
                 '<a href="/admin/trade_network/node/{id}">{name}</a>',
-                id=obj.supplier.id,
+                id=obj.supplier_id,
                 name=obj.supplier
             )
 
 
     @admin.action(description='clear debt_to_the_supplier')
-    def clear_dept(self, request, queryset: QuerySet) -> None:
+    def clear_dept(self, request, queryset: QuerySet) -> Optional[TemplateResponse]:
         """
         The clear_dept(self, request, queryset: QuerySet function defines a method of the NodeAdmin class.
         It takes an instance of its own class, a request object, and a queryset object as arguments.
-        Defines actions when the corresponding actions are selected in the Admin panel.
+        Defines actions when the corresponding actions are selected in the Admin panel. First shows a preview
+        of the number of members and the total amount to clear, then, once confirmed, writes the debt off
+        through the debt ledger by a background job in bounded batches.
+        """
+        if request.POST.get("post") != "yes":
+            members, amount = debt_summary(queryset)
+            return TemplateResponse(request, "admin/trade_network/node/clear_debt_confirmation.html", {
+                **self.admin_site.each_context(request),
+                "title": "Clear debt_to_the_supplier",
+                "opts": self.model._meta,
+                "members": members,
+                "amount": amount,
+                "largest": queryset.select_related(None).filter(debt_to_the_supplier__gt=0)
+                .order_by("-debt_to_the_supplier", "-id").only("id", "name", "debt_to_the_supplier")[:10],
+                "chunk_size": settings.DEBT_CLEAR_CHUNK_SIZE,
+                "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                "select_across": request.POST.get("select_across") == "1",
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            })
+        params: dict = {**selection_params(queryset), "comment": f"cleared in the admin panel by {request.user}"}
+        self.queued(request, enqueue("clear_debts", params, user=request.user))
+        return None
+
+    @admin.action(description='export selected members')
+    def export_selected(self, request, queryset: QuerySet) -> None:
+        """
+        The export_selected function defines an action of the Admin panel. Queues an NDJSON export
+        of the selected members.
+        """
+        self.queued(request, enqueue("export_network", {**selection_params(queryset), "type": "ndjson"},
+                                     user=request.user))
+
+    @admin.action(description='rebuild the hierarchy of the whole network')
+    def rebuild_hierarchy(self, request, queryset: QuerySet) -> None:
+        """
+        The rebuild_hierarchy function defines an action of the Admin panel. Queues the recomputation
+        of the materialized paths and levels of all members, whatever the selection.
         """
-        queryset.update(debt_to_the_supplier=0)
+        self.queued(request, enqueue("rebuild_hierarchy", user=request.user))
+
+    def queued(self, request, job: Job) -> None:
+        """
+        The queued function takes as arguments the request object and a queued job.
+        Shows a message with the link to the progress of the job.
+        """
+        url: str = reverse("admin:trade_network_job_change", args=[job.pk])
+        self.message_user(request, format_html('Job <a href="{}">{}</a> queued.', url, job))
 
 
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     """
     The ProductAdmin class inherits from the ModelAdmin class. Defines the output of instance fields
     to the administration panel and the ability to edit them.
     """
     list_display: Tuple[str, ...] = ("name", "model", "release_date", "owner")
     list_display_links = ('name', 'owner')
-    search_fields: Tuple[str, ...] = ("name", "model", "release_date")
+    list_filter: Tuple[str, ...] = ("release_date", )
+    list_select_related: Tuple[str, ...] = ("owner", )
+    autocomplete_fields: Tuple[str, ...] = ("owner", )
+    paginator: type = CachedCountPaginator
+    show_full_result_count: bool = False
+    search_fields: Tuple[str, ...] = ("name", "model")
     save_on_top = True
 
 
+class JobAdmin(admin.ModelAdmin):
+    """
+    The JobAdmin class inherits from the ModelAdmin class. Shows the background jobs with their progress
+    and outcome. Jobs are created by the actions of the other admins and the API, not edited here.
+    """
+    list_display: Tuple[str, ...] = ("id", "kind", "status", "progress", "attempts", "created_by", "created",
+                                     "finished")
+    list_filter: Tuple[str, ...] = ("status", "kind")
+    list_select_related: Tuple[str, ...] = ("created_by", )
+    readonly_fields: Tuple[str, ...] = ("kind", "params", "status", "progress", "processed", "total", "result",
+                                        "error", "attempts", "max_attempts", "run_after", "worker", "heartbeat",
+                                        "created_by", "created", "started", "finished")
+    exclude: Tuple[str, ...] = ()
+
+    def progress(self, obj: Job) -> str:
+        """
+        The progress function takes as an argument a job. Returns its progress for the changelist.
+        """
+        percent = obj.percent
+        if percent is None:
+            return f"{obj.processed}" if obj.processed else "-"
+        return f"{percent}% ({obj.processed} of {obj.total})"
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+
 admin.site.register(Node, NodeAdmin)
 admin.site.register(Product, ProductAdmin)
+admin.site.register(Job, JobAdmin)
 
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.db.models import Count, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce
+
+from trade_network.models import Node, Product
+
+GROUPINGS: Dict[str, Tuple[str, ...]] = {
+    "level": ("level",),
+    "country": ("contact__country",),
+    "supplier": ("supplier_id", "supplier__name"),
+}
+
+
+def group_totals(nodes: QuerySet, group_by: str) -> List[dict]:
+    """
+    The group_totals function takes as arguments a filtered queryset of the Node class and the name
+    of the grouping. Computes the number of members, their total debt to the supplier and the number
+    of their products per group with two GROUP BY queries, one for members and one for products,
+    so the debt is never multiplied by the product join. Returns the list of groups.
+    """
+    keys: Tuple[str, ...] = GROUPINGS[group_by]
+    if group_by == "supplier":
+        nodes = nodes.filter(supplier__isnull=False)
+
+    groups: List[dict] = list(
+        nodes.order_by().values(*keys).annotate(
+            members=Count("id"),
+            total_debt=Coalesce(Sum("debt_to_the_supplier"), Decimal(0)),
+        ).order_by(*keys)
+    )
+    products: Dict[tuple, int] = {
+        row[:-1]: row[-1]
+        for row in Product.objects.filter(owner__in=nodes.values("id")).order_by().values_list(
+            *(f"owner__{key}" for key in keys)
+        ).annotate(count=Count("id"))
+    }
+    for group in groups:
+        group["products"] = products.get(tuple(group[key] for key in keys), 0)
+    return groups
+
+
+def subtree_totals(node: Node) -> dict:
+    """
+    The subtree_totals function takes as an argument an instance of the Node class. Rolls up the whole
+    downstream tree of the member, resolved by the prefix of its materialized path: the number of members,
+    of direct customers, their total debt and the number of their products. Returns the totals.
+    """
+    totals: dict = node.get_descendants().aggregate(
+        members=Count("id"),
+        direct_customers=Count("id", filter=Q(supplier_id=node.id)),
+        total_debt=Coalesce(Sum("debt_to_the_supplier"), Decimal(0)),
+    )
+    totals["products"] = Product.objects.filter(owner__path__startswith=node.subtree_prefix).count()
+    return totals
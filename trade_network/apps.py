@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TradeNetworkConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trade_network'
+
+    def ready(self) -> None:
+        from trade_network import signals  # noqa: F401
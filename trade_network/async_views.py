@@ -0,0 +1,159 @@
+from typing import List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from test_task_1.fastjson import FastJSONRenderer
+from test_task_1.routers import allow_replica_reads
+from trade_network.models import Node
+from trade_network.serializers import NodeListSerializer, NodeSerializer
+
+
+def _authenticate(request: HttpRequest):
+    """
+    The _authenticate function is a utility function. It takes as an argument a Django request object.
+    Runs the authentication classes configured for the API. Returns the authenticated user or None.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = drf_request.user
+    except APIException:
+        return None
+    return user if user.is_authenticated and user.is_active else None
+
+
+class AsyncNodeReadView(View):
+    """
+    The AsyncNodeReadView class inherits from the View class from the django.views module. It is the base
+    class of the async read views of the trading network. The handlers do not hold a worker thread while
+    waiting for the database, only the authentication and throttling steps run in a thread. Access is limited
+    to active authenticated users and to the same rate limits as in the sync views. GET requests read
+    from a replica when one is configured.
+    """
+    renderer: FastJSONRenderer = FastJSONRenderer()
+    queryset: QuerySet = Node.objects.select_related("supplier", "contact")
+    throttle_scope: Optional[str] = None
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        The dispatch function overrides the method of the parent class. Authenticates the request before
+        calling the handler. Returns the 401 response for anonymous requests.
+        """
+        user = await sync_to_async(_authenticate)(request)
+        if user is None:
+            response: HttpResponse = self.render({"detail": "Authentication credentials were not provided."},
+                                                 status.HTTP_401_UNAUTHORIZED)
+            response["WWW-Authenticate"] = 'Basic realm="api"'
+            return response
+        wait: Optional[float] = await sync_to_async(self.check_throttles)(request, user)
+        if wait is not None:
+            throttled: Throttled = Throttled(wait)
+            response = self.render({"detail": throttled.detail}, throttled.status_code)
+            response["Retry-After"] = str(throttled.wait)
+            return response
+        if request.method == "GET":
+            await sync_to_async(allow_replica_reads)(user)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def check_throttles(self, request: HttpRequest, user) -> Optional[float]:
+        """
+        The check_throttles function takes as arguments the request object and the authenticated user.
+        Takes a token from every bucket configured for the API, as APIView does for the sync views,
+        so the async views share the budgets of the sync ones. Returns the seconds to wait if the request
+        is throttled, otherwise None.
+        """
+        drf_request: Request = Request(request)
+        drf_request.user = user
+        waits: List[float] = []
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not throttle.allow_request(drf_request, self):
+                waits.append(throttle.wait())
+        return max(waits) if waits else None
+
+    def render(self, data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+        """
+        The render function takes as arguments serialized data and a status code.
+        Returns the response with the data rendered by the API JSON renderer.
+        """
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type="application/json")
+
+
+class AsyncNodeListView(AsyncNodeReadView):
+    """
+    The AsyncNodeListView class inherits from the AsyncNodeReadView class and is a class-based view
+    for processing requests with GET methods at the address '/trade_network/async/node/list'.
+    Supports the "contact__country" filter and the limit/offset pagination of the sync list endpoint.
+    """
+    throttle_scope: str = "list"
+
+    async def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        The get function takes the request object and any positional and named arguments as parameters.
+        Returns the serialized page of members, or all members if no limit is given.
+        """
+        queryset: QuerySet = self.queryset.all()
+        if "contact__country" in request.GET:
+            queryset = queryset.filter(contact__country=request.GET["contact__country"])
+
+        limit: Optional[int] = _positive_int(request.GET.get("limit"))
+        if limit is None:
+            nodes: List[Node] = [node async for node in queryset]
+            return self.render(NodeListSerializer(nodes, many=True).data)
+
+        offset: int = _positive_int(request.GET.get("offset")) or 0
+        count: int = await queryset.acount()
+        nodes = [node async for node in queryset[offset:offset + limit]]
+
+        url: str = request.build_absolute_uri()
+        next_url: Optional[str] = None
+        if offset + limit < count:
+            next_url = replace_query_param(replace_query_param(url, "limit", limit), "offset", offset + limit)
+        previous_url: Optional[str] = None
+        if offset > 0:
+            previous_url = replace_query_param(url, "limit", limit)
+            previous_url = (remove_query_param(previous_url, "offset") if offset - limit <= 0
+                            else replace_query_param(previous_url, "offset", offset - limit))
+
+        return self.render({
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": NodeListSerializer(nodes, many=True).data,
+        })
+
+
+class AsyncNodeView(AsyncNodeReadView):
+    """
+    The AsyncNodeView class inherits from the AsyncNodeReadView class and is a class-based view
+    for processing requests with GET methods at the address '/trade_network/async/node/<pk>'.
+    """
+    async def get(self, request: HttpRequest, pk, *args, **kwargs) -> HttpResponse:
+        """
+        The get function takes the request object, the primary key of the member and any other positional
+        and named arguments as parameters. Returns the serialized member or the 404 response.
+        """
+        try:
+            node: Node = await self.queryset.aget(pk=pk)
+        except (Node.DoesNotExist, ValueError):
+            return self.render({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+        return self.render(NodeSerializer(node).data)
+
+
+def _positive_int(value: Optional[str]) -> Optional[int]:
+    """
+    The _positive_int function is a utility function. It takes as an argument a query parameter value.
+    Returns the value as a positive integer or None if it is missing or invalid.
+    """
+    try:
+        number: int = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
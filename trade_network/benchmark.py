@@ -0,0 +1,157 @@
+import io
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.db import close_old_connections, connections, transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from test_task_1.fastjson import FastJSONParser, FastJSONRenderer, orjson
+
+from trade_network.models import Node, Contact, Product
+from trade_network.renderers import CompactJSONRenderer
+
+BATCH_SIZE: int = 1000
+COUNTRIES: List[str] = ["Russia", "Kazakhstan", "Belarus", "Armenia", "Georgia", "Serbia", "Turkey", "China"]
+CITIES: List[str] = ["Moscow", "Almaty", "Minsk", "Yerevan", "Tbilisi", "Belgrade", "Istanbul", "Shenzhen"]
+
+
+def percentile(values: List[float], share: float) -> float:
+    """
+    The percentile function takes as arguments a list of values and a share between 0 and 1.
+    Returns the value below which the given share of sorted values falls.
+    """
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def summarize(latencies: List[float], elapsed: float) -> dict:
+    """
+    The summarize function takes as arguments the latencies of the calls in seconds and the total time
+    of the run. Returns the throughput and the latency statistics in milliseconds.
+    """
+    milliseconds: List[float] = [latency * 1000 for latency in latencies]
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(milliseconds) if milliseconds else 0.0,
+        "p50_ms": percentile(milliseconds, 0.5),
+        "p99_ms": percentile(milliseconds, 0.99),
+    }
+
+
+def measure(call: Callable[[int], None], iterations: int) -> dict:
+    """
+    The measure function takes as arguments a callable receiving the number of the call and the number
+    of calls. Runs the calls one after another. Returns the summary of their latencies.
+    """
+    latencies: List[float] = []
+    started: float = time.perf_counter()
+    for number in range(iterations):
+        call_started: float = time.perf_counter()
+        call(number)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def measure_codecs(data, iterations: int) -> dict:
+    """
+    The measure_codecs function takes as arguments serialized data, usually a large page, and the number
+    of calls. Measures rendering with the DRF, the fast and the compact JSON renderers and parsing with
+    the DRF and the fast JSON parsers. Returns the results with the document sizes and the accelerator in use.
+    """
+    results: dict = {"accelerator": "orjson" if orjson is not None else None, "render": {}, "parse": {}}
+    for name, renderer in (("drf_json", JSONRenderer()), ("fast_json", FastJSONRenderer()),
+                           ("compact_json", CompactJSONRenderer())):
+        results["render"][name] = {**measure(lambda _: renderer.render(data), iterations),
+                                   "bytes": len(renderer.render(data))}
+    document: bytes = JSONRenderer().render(data)
+    for name, parser in (("drf_json", JSONParser()), ("fast_json", FastJSONParser())):
+        results["parse"][name] = measure(lambda _: parser.parse(io.BytesIO(document), parser_context={}), iterations)
+    return results
+
+
+@contextmanager
+def connection_lifetime(max_age: Optional[int]) -> Iterator[Callable[[Callable[[int], None]], Callable[[int], None]]]:
+    """
+    The connection_lifetime function is a context manager. It takes as an argument the CONN_MAX_AGE to apply
+    to all database connections for the block, 0 for a new connection per request and None for persistent ones.
+    Yields a wrapper that runs the end-of-request connection handling before every call, as the server does
+    between requests and the test client does not. Restores the previous settings afterwards.
+    """
+    previous: Dict[str, Optional[int]] = {}
+    for connection in connections.all():
+        previous[connection.alias] = connection.settings_dict["CONN_MAX_AGE"]
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        connection.close()
+
+    def wrap(call: Callable[[int], None]) -> Callable[[int], None]:
+        def run(number: int) -> None:
+            close_old_connections()
+            call(number)
+        return run
+
+    try:
+        yield wrap
+    finally:
+        for connection in connections.all():
+            connection.settings_dict["CONN_MAX_AGE"] = previous[connection.alias]
+            connection.close()
+
+
+def generate_network(factories: int, chains: int, sole_proprietors: int, products_per_node: int = 3,
+                     seed: int = 0) -> Dict[str, List[int]]:
+    """
+    The generate_network function takes as arguments the number of factories, retail chains and sole proprietors,
+    the number of products per member and the seed of the random generator. Builds a reproducible synthetic
+    three-level network: every retail chain is supplied by a factory and every sole proprietor by a retail chain
+    or directly by a factory. Every member gets a contact and products. Returns the primary keys of the members
+    by kind: "factories", "chains" and "sole_proprietors".
+    """
+    rng: random.Random = random.Random(seed)
+    members: Dict[str, List[int]] = {"factories": [], "chains": [], "sole_proprietors": []}
+    paths: Dict[int, str] = {}
+    contacts: List[Contact] = []
+    products: List[Product] = []
+
+    def create_members(kind: str, count: int, pick_supplier: Callable[[], Optional[int]]) -> None:
+        nodes: List[Node] = []
+        for number in range(count):
+            supplier = pick_supplier()
+            nodes.append(Node(
+                name=f"bench-{kind}-{number}-{seed}",
+                supplier_id=supplier,
+                level=0 if supplier is None else paths[supplier].count("/") - 1,
+                path="/" if supplier is None else paths[supplier],
+                debt_to_the_supplier=Decimal(0) if supplier is None else Decimal(rng.randint(0, 10 ** 6)) / 100,
+            ))
+        for node in Node.objects.bulk_create(nodes, batch_size=BATCH_SIZE):
+            paths[node.id] = node.subtree_prefix
+            members[kind].append(node.id)
+            place: int = rng.randrange(len(COUNTRIES))
+            contacts.append(Contact(memder_id=node.id, email=f"{node.name}@example.com", country=COUNTRIES[place],
+                                    city=CITIES[place], street="Lenina", house_number=str(rng.randint(1, 200))))
+            products.extend(
+                Product(owner_id=node.id, name=f"product-{number % 50}", model=f"M{number}",
+                        release_date=date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500)),
+                        selling_price=Decimal(rng.randint(100, 10 ** 6)) / 100)
+                for number in range(products_per_node)
+            )
+
+    with transaction.atomic():
+        create_members("factories", factories, lambda: None)
+        create_members("chains", chains, lambda: rng.choice(members["factories"]))
+        create_members("sole_proprietors", sole_proprietors, lambda: (
+            rng.choice(members["chains"]) if members["chains"] and rng.random() < 0.8
+            else rng.choice(members["factories"])
+        ))
+        Contact.objects.bulk_create(contacts, batch_size=BATCH_SIZE)
+        Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+    return members
@@ -0,0 +1,102 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from test_task_1.routers import reading_from_replica
+
+VERSION_KEY: str = "trade_network:version"
+
+
+def get_cache():
+    """
+    The get_cache function returns the cache configured for the trade network responses
+    by the TRADE_NETWORK_CACHE setting.
+    """
+    return caches[getattr(settings, "TRADE_NETWORK_CACHE", "default")]
+
+
+def network_version() -> float:
+    """
+    The network_version function returns the moment of the last change of the trading network as a timestamp.
+    The version is kept in the cache and initialized with the current time when it is missing, so an evicted
+    version never makes a stale response valid again.
+    """
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        now: float = time.time()
+        cache.add(VERSION_KEY, now, timeout=None)
+        version = cache.get(VERSION_KEY, now)
+    return version
+
+
+def _bump_version() -> None:
+    cache = get_cache()
+    version = cache.get(VERSION_KEY) or 0
+    cache.set(VERSION_KEY, max(time.time(), version + 0.001), timeout=None)
+
+
+def invalidate_network() -> None:
+    """
+    The invalidate_network function marks all cached responses of the trading network as stale
+    by moving the version forward. It must be called after every change of Node, Contact or Product rows.
+    The version is moved once right away and once more when the current transaction commits, so a response
+    read before the commit cannot stay cached under the new version.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+class CachedRetrieveMixin:
+    """
+    The CachedRetrieveMixin class is a mixin for the generic read views. Keeps the serialized data
+    of GET responses in the cache under the current network version and answers conditional GET requests
+    with the ETag and Last-Modified headers derived from that version.
+    """
+    cache_timeout_setting: str = "TRADE_NETWORK_CACHE_TIMEOUT"
+
+    def get_cache_timeout(self) -> int:
+        """
+        The get_cache_timeout function returns the number of seconds a response is cached for. Data read
+        from a replica may lag behind the version it is stored under, so it is kept no longer than
+        the replica lag allowed by REPLICA_PIN_SECONDS.
+        """
+        timeout: int = getattr(settings, self.cache_timeout_setting, 300)
+        if reading_from_replica():
+            timeout = min(timeout, getattr(settings, "REPLICA_PIN_SECONDS", 5))
+        return timeout
+
+    def get(self, request, *args, **kwargs):
+        """
+        The get function overrides the method of the parent class. It takes the request object and any
+        positional and named arguments as parameters. Returns the 304 response if the client already has
+        the current version, the cached data if present, otherwise calls the method of the parent class
+        and stores its data in the cache.
+        """
+        version: float = network_version()
+        etag: str = '"{}"'.format(hashlib.md5(f"{version}:{request.get_full_path()}".encode()).hexdigest())
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=int(version))
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        cache = get_cache()
+        key: str = f"trade_network:response:{etag}"
+        data = cache.get(key)
+        if data is None:
+            response: Response = super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, self.get_cache_timeout())
+        else:
+            response = Response(data)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(int(version))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,52 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
+from trade_network.cache import invalidate_network
+from trade_network.models import Node, Product
+from trade_network.serializers import ProductUpsertSerializer
+
+BATCH_SIZE: int = 1000
+UPDATE_FIELDS: List[str] = ["release_date", "selling_price"]
+
+
+def upsert_products(rows: Iterable[dict]) -> Tuple[int, List[dict]]:
+    """
+    The upsert_products function takes as an argument an iterable of catalog rows. Validates every row,
+    checks the owners with one query and writes the valid rows with INSERT ... ON CONFLICT DO UPDATE keyed
+    on (owner, name, model), so a full catalog refresh takes a few statements. Only the fields a row sends
+    are updated on conflict, so rows are written in one group per set of sent fields. A later row with the same key
+    replaces an earlier one. Returns the number of written products and the list of per-row errors.
+    """
+    errors: Dict[int, dict] = {}
+    products: Dict[Tuple[int, str, str], Tuple[int, Product, Tuple[str, ...]]] = {}
+    for index, row in enumerate(rows):
+        serializer = ProductUpsertSerializer(data=row)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        product: Product = Product(**serializer.validated_data)
+        sent: Tuple[str, ...] = tuple(field for field in UPDATE_FIELDS if field in serializer.validated_data)
+        products[(product.owner_id, product.name, product.model)] = (index, product, sent)
+
+    owners: set = set(Node.objects.filter(id__in={key[0] for key in products}).values_list("id", flat=True))
+    for key in [key for key in products if key[0] not in owners]:
+        index, _, _ = products.pop(key)
+        errors[index] = {"owner": [f"Node {key[0]} does not exist."]}
+
+    groups: Dict[Tuple[str, ...], List[Product]] = defaultdict(list)
+    for _, product, sent in products.values():
+        groups[sent].append(product)
+    if products:
+        with transaction.atomic():
+            for sent, group in groups.items():
+                Product.objects.bulk_create(
+                    group,
+                    batch_size=BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=["owner", "name", "model"],
+                    update_fields=list(sent),
+                )
+            invalidate_network()
+    return len(products), [{"row": index, "errors": errors[index]} for index in sorted(errors)]
@@ -0,0 +1,97 @@
+import csv
+import json
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from trade_network.models import Node
+
+CHUNK_SIZE: int = 2000
+
+NODE_COLUMNS: Dict[str, str] = {
+    "id": "id",
+    "name": "name",
+    "level": "level",
+    "supplier": "supplier__name",
+    "debt_to_the_supplier": "debt_to_the_supplier",
+    "date_of_creation": "date_of_creation",
+    "email": "contact__email",
+    "country": "contact__country",
+    "city": "contact__city",
+    "street": "contact__street",
+    "house_number": "contact__house_number",
+}
+PRODUCT_COLUMNS: Dict[str, str] = {
+    "name": "product__name",
+    "model": "product__model",
+    "release_date": "product__release_date",
+    "selling_price": "product__selling_price",
+}
+CSV_HEADER: List[str] = [*NODE_COLUMNS, *(f"product_{column}" for column in PRODUCT_COLUMNS)]
+
+
+def export_queryset(queryset: Optional[QuerySet] = None) -> QuerySet:
+    """
+    The export_queryset function takes as an argument an optional queryset of the Node class. Returns a queryset
+    of flat rows of members joined with their supplier name, contact and products in one LEFT JOIN query,
+    ordered so that all products of a member are adjacent.
+    """
+    queryset = Node.objects.all() if queryset is None else queryset
+    return queryset.values_list(*NODE_COLUMNS.values(), *PRODUCT_COLUMNS.values()).order_by("id", "product__id")
+
+
+def iter_rows(queryset: Optional[QuerySet] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple]:
+    """
+    The iter_rows function takes as arguments an optional queryset of the Node class and the number of rows
+    fetched per round-trip. Reads the joined rows through a server-side cursor where the database supports it,
+    so memory stays flat regardless of the size of the table. Returns an iterator of flat rows.
+    """
+    return export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+def iter_ndjson(queryset: Optional[QuerySet] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    The iter_ndjson function takes as arguments an optional queryset of the Node class and the chunk size.
+    Groups adjacent joined rows by member. Returns an iterator of NDJSON lines, one member per line
+    with its products nested.
+    """
+    width: int = len(NODE_COLUMNS)
+    current: Optional[dict] = None
+    for row in iter_rows(queryset, chunk_size):
+        if current is None or current["id"] != row[0]:
+            if current is not None:
+                yield json.dumps(current, cls=DjangoJSONEncoder) + "\n"
+            current = dict(zip(NODE_COLUMNS, row[:width]))
+            current["products"] = []
+        if row[width] is not None:
+            current["products"].append(dict(zip(PRODUCT_COLUMNS, row[width:])))
+    if current is not None:
+        yield json.dumps(current, cls=DjangoJSONEncoder) + "\n"
+
+
+class _Echo:
+    """
+    The _Echo class is a pseudo-buffer that returns the written value instead of storing it,
+    so csv.writer can produce one line at a time for a streaming response.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(queryset: Optional[QuerySet] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    The iter_csv function takes as arguments an optional queryset of the Node class and the chunk size.
+    Returns an iterator of CSV lines starting with the header, one line per product of a member
+    or one line for a member without products.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in iter_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+EXPORT_FORMATS: Dict[str, Tuple[str, Callable[..., Iterator[str]]]] = {
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+    "csv": ("text/csv", iter_csv),
+}
@@ -0,0 +1,114 @@
+from typing import Dict, Optional, Set, Tuple
+
+from django.db.models import Prefetch, QuerySet
+from django.db.models.query_utils import DeferredAttribute
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_QUERY_PARAM: str = "fields"
+EXPAND_QUERY_PARAM: str = "expand"
+
+
+def parse_names(value: Optional[str]) -> Optional[Set[str]]:
+    """
+    The parse_names function takes as an argument the value of a comma-separated query parameter.
+    Returns the set of names or None if the parameter is missing.
+    """
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    The SparseFieldsetMixin class is a mixin for model serializers. Accepts the "fields" and "expand" arguments:
+    "fields" keeps only the listed fields, "expand" adds the fields listed in expandable_fields, which are left out
+    by default, and keeps nested fields that "fields" would drop. Unknown names raise a ValidationError.
+    """
+    expandable_fields: Tuple[str, ...] = ()
+
+    def __init__(self, *args, fields: Optional[Set[str]] = None, expand: Optional[Set[str]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        expand = expand or set()
+        unknown: Dict[str, list] = {}
+        if fields is not None and fields - set(self.fields):
+            unknown[FIELDS_QUERY_PARAM] = [f"Unknown field: {name}." for name in sorted(fields - set(self.fields))]
+        if expand - set(self.fields):
+            unknown[EXPAND_QUERY_PARAM] = [f"Unknown field: {name}." for name in sorted(expand - set(self.fields))]
+        if unknown:
+            raise ValidationError(unknown)
+
+        for name in list(self.fields):
+            if name in self.expandable_fields and name not in expand:
+                self.fields.pop(name)
+            elif fields is not None and name not in fields and name not in expand:
+                self.fields.pop(name)
+
+
+def trim_queryset(queryset: QuerySet, serializer: serializers.ModelSerializer) -> QuerySet:
+    """
+    The trim_queryset function takes as arguments a queryset and a serializer of its model. Loads only the columns
+    the fields of the serializer read, joins only the relations they use and prefetches the expanded reverse
+    relations. The primary key and the default ordering fields are always loaded. Returns the new queryset.
+    """
+    model = queryset.model
+    columns: Set[str] = {model._meta.pk.name, *(name.lstrip("-") for name in model._meta.ordering)}
+    joins: Set[str] = set()
+    prefetches: list = []
+
+    for field in serializer.fields.values():
+        if field.source == "*":
+            return queryset
+        name: str = field.source.split(".")[0]
+        if isinstance(field, serializers.ListSerializer):
+            related = field.child.Meta.model
+            related_columns: list = [getattr(model, name).field.name, related._meta.pk.name, *(
+                child.source for child in field.child.fields.values() if child.source != "*"
+            )]
+            prefetches.append(Prefetch(name, queryset=related.objects.only(*related_columns)))
+        elif isinstance(field, serializers.Serializer):
+            joins.add(name)
+            columns.update(f"{name}__{child.source}" for child in field.fields.values() if child.source != "*")
+        elif isinstance(field, serializers.SlugRelatedField):
+            joins.add(name)
+            columns.update((name, f"{name}__{field.slug_field}"))
+        elif isinstance(getattr(model, name, None), DeferredAttribute):
+            columns.add(name)
+        else:
+            return queryset
+
+    return queryset.select_related(None).select_related(*joins).prefetch_related(*prefetches).only(*columns)
+
+
+class SparseFieldsetViewMixin:
+    """
+    The SparseFieldsetViewMixin class is a mixin for the generic read views. Passes the "fields" and "expand"
+    query parameters of GET requests to the serializer and trims the SQL of the queryset to the requested fields.
+    """
+    def get_fieldset(self) -> Dict[str, Optional[Set[str]]]:
+        """
+        The get_fieldset function returns the "fields" and "expand" arguments of the serializer
+        for GET requests, otherwise an empty dictionary.
+        """
+        if self.request.method != "GET":
+            return {}
+        params = self.request.query_params
+        return {"fields": parse_names(params.get(FIELDS_QUERY_PARAM)),
+                "expand": parse_names(params.get(EXPAND_QUERY_PARAM))}
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        The get_serializer function overrides the method of the parent class. Adds the requested fieldset
+        to the arguments of the serializer. Returns the serializer instance.
+        """
+        return super().get_serializer(*args, **self.get_fieldset(), **kwargs)
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        The filter_queryset function overrides the method of the parent class. Trims the filtered queryset
+        of GET requests to the columns and relations of the requested fieldset. Returns the queryset.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != "GET":
+            return queryset
+        return trim_queryset(queryset, self.get_serializer())
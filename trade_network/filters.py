@@ -0,0 +1,70 @@
+from typing import List
+
+from django.db.models import Q, QuerySet
+from django_filters import rest_framework as filters
+
+from trade_network.models import Node, Product, normalize_location
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    The ProductFilter class inherits from the FilterSet class from django_filters.rest_framework.
+    Filters the catalog by owner, release date range and selling price range.
+    """
+    released_after = filters.DateFilter(field_name="release_date", lookup_expr="gte")
+    released_before = filters.DateFilter(field_name="release_date", lookup_expr="lte")
+    min_price = filters.NumberFilter(field_name="selling_price", lookup_expr="gte")
+    max_price = filters.NumberFilter(field_name="selling_price", lookup_expr="lte")
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the filter set,
+        defines the model and the exact-match fields.
+        """
+        model = Product
+        fields = ["owner", "name", "model"]
+
+
+class NodeLocationFilter(filters.FilterSet):
+    """
+    The NodeLocationFilter class inherits from the FilterSet class from django_filters.rest_framework.
+    Searches members of the trading network by the normalized country and city keys of their contacts.
+    Both parameters take comma-separated values and are case-insensitive; with "match=prefix" every value
+    matches the names starting with it. Sorted by debt, largest first, unless "ordering" is given.
+    """
+    country = filters.CharFilter(method="filter_location")
+    city = filters.CharFilter(method="filter_location")
+    match = filters.ChoiceFilter(choices=[("exact", "exact"), ("prefix", "prefix")], method="filter_match")
+    ordering = filters.OrderingFilter(fields=(("debt_to_the_supplier", "debt"), ("name", "name"), ("id", "id")))
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the filter set,
+        defines the model of the filter set.
+        """
+        model = Node
+        fields: List[str] = []
+
+    def filter_match(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """
+        The filter_match function leaves the queryset as is, the match mode is read by filter_location.
+        """
+        return queryset
+
+    def filter_location(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """
+        The filter_location function takes as arguments a queryset, the name of the parameter and its value.
+        Filters the queryset by any of the comma-separated values of the parameter matched against the indexed
+        normalized key: one IN lookup for exact matching, one indexed prefix lookup per value otherwise.
+        Returns the filtered queryset.
+        """
+        keys: List[str] = [key for key in map(normalize_location, value.split(",")) if key]
+        if not keys:
+            return queryset
+        field: str = f"contact__{name}_key"
+        if self.form.cleaned_data.get("match") == "prefix":
+            condition: Q = Q()
+            for key in keys:
+                condition |= Q(**{f"{field}__startswith": key})
+            return queryset.filter(condition)
+        return queryset.filter(**{f"{field}__in": keys})
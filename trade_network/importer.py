@@ -0,0 +1,144 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from trade_network.cache import invalidate_network
+from trade_network.models import Node, Contact, Product
+from trade_network.serializers import NodeImportSerializer
+
+MAX_LEVEL: int = 2
+BATCH_SIZE: int = 1000
+CYCLE_MESSAGE: str = "Supplier chain contains a cycle."
+DEPTH_MESSAGE: str = "Incorrect links in the hierarchical system"
+SUPPLIER_MESSAGE: str = "Supplier row could not be imported."
+
+
+def import_nodes(rows: Iterable[dict]) -> Tuple[int, List[dict]]:
+    """
+    The import_nodes function takes as an argument an iterable of rows describing members of the trading network
+    with their contacts and products. Validates every row, resolves supplier names and hierarchical levels
+    in memory and writes the valid members level by level with bulk_create inside one transaction.
+    Returns the number of created members and the list of per-row errors.
+    """
+    errors: Dict[int, dict] = {}
+    rows_by_name: Dict[str, Tuple[int, dict]] = {}
+
+    for index, row in enumerate(rows):
+        serializer = NodeImportSerializer(data=row)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        name: str = serializer.validated_data["name"]
+        if name in rows_by_name:
+            errors[index] = {"name": ["Duplicate name in the import."]}
+            continue
+        rows_by_name[name] = (index, serializer.validated_data)
+
+    for name in Node.objects.filter(name__in=list(rows_by_name)).values_list("name", flat=True):
+        index, _ = rows_by_name.pop(name)
+        errors[index] = {"name": ["trading network member with this name already exists."]}
+
+    referenced: set = {data["supplier"] for _, data in rows_by_name.values() if data["supplier"] is not None}
+    existing: Dict[str, Tuple[int, str]] = {
+        name: (pk, f"{path}{pk}/")
+        for name, pk, path in Node.objects.filter(name__in=referenced - set(rows_by_name)).values_list(
+            "name", "id", "path"
+        )
+    }
+
+    levels: Dict[str, int] = _resolve_levels(rows_by_name, existing, errors)
+    with transaction.atomic():
+        created: int = _write_levels(rows_by_name, levels, existing)
+        if created:
+            invalidate_network()
+    return created, [{"row": index, "errors": errors[index]} for index in sorted(errors)]
+
+
+def _resolve_levels(rows_by_name: Dict[str, Tuple[int, dict]], existing: Dict[str, Tuple[int, str]],
+                    errors: Dict[int, dict]) -> Dict[str, int]:
+    """
+    The _resolve_levels function is a utility function. It takes as arguments the valid rows of the import by name,
+    the already stored suppliers and the dictionary of errors. Walks the supplier chain of every row once,
+    memoizing the result, and records errors for unknown suppliers, cycles and chains deeper than the hierarchy
+    allows. Removes failed rows from rows_by_name. Returns the level of every row that can be imported.
+    """
+    levels: Dict[str, int] = {}
+    failed: Dict[str, str] = {}
+
+    for start in list(rows_by_name):
+        chain: List[str] = []
+        name: Optional[str] = start
+        level: Optional[int] = None
+        reason: Optional[str] = None
+        while name is not None:
+            if name in levels:
+                level = levels[name]
+                break
+            if name in failed:
+                reason = SUPPLIER_MESSAGE
+                break
+            if name in existing:
+                level = existing[name][1].count("/") - 2
+                break
+            if name not in rows_by_name:
+                reason = f"Supplier '{name}' does not exist."
+                break
+            if name in chain:
+                reason = CYCLE_MESSAGE
+                break
+            chain.append(name)
+            name = rows_by_name[name][1]["supplier"]
+        else:
+            level = -1
+
+        for name in reversed(chain):
+            if reason is None:
+                level += 1
+                if level > MAX_LEVEL:
+                    reason = DEPTH_MESSAGE
+            if reason is None:
+                levels[name] = level
+            else:
+                failed[name] = reason
+                if reason != CYCLE_MESSAGE:
+                    reason = SUPPLIER_MESSAGE
+
+    for name, reason in failed.items():
+        index, _ = rows_by_name.pop(name)
+        errors[index] = {"supplier": [reason]}
+    return levels
+
+
+def _write_levels(rows_by_name: Dict[str, Tuple[int, dict]], levels: Dict[str, int],
+                  existing: Dict[str, Tuple[int, str]]) -> int:
+    """
+    The _write_levels function is a utility function. It takes as arguments the valid rows of the import by name,
+    their levels and the already stored suppliers. Must be called inside a transaction. Inserts the members
+    level by level so that the identifiers of the suppliers are known before their customers are built,
+    then inserts all contacts and products. Returns the number of created members.
+    """
+    by_level: Dict[int, List[str]] = defaultdict(list)
+    for name, level in levels.items():
+        by_level[level].append(name)
+
+    stored: Dict[str, Tuple[int, str]] = dict(existing)
+    contacts: List[Contact] = []
+    products: List[Product] = []
+
+    for level in sorted(by_level):
+        nodes: List[Node] = []
+        for name in by_level[level]:
+            supplier: Optional[str] = rows_by_name[name][1]["supplier"]
+            supplier_id, path = stored[supplier] if supplier is not None else (None, "/")
+            nodes.append(Node(name=name, supplier_id=supplier_id, level=level, path=path))
+        for node in Node.objects.bulk_create(nodes, batch_size=BATCH_SIZE):
+            stored[node.name] = (node.id, node.subtree_prefix)
+            data: dict = rows_by_name[node.name][1]
+            contacts.append(Contact(memder=node, **data.get("contact", {})))
+            products.extend(Product(owner=node, **product) for product in data.get("products", []))
+
+    Contact.objects.bulk_create(contacts, batch_size=BATCH_SIZE)
+    Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+    return len(levels)
@@ -0,0 +1,251 @@
+"""
+Background jobs of the trading network.
+
+Heavy operations are queued as rows of the Job table and run by the "run_jobs" management command, so they never
+block a web worker and need no outside broker. A worker claims the oldest due job, runs its handler and records
+the outcome. Handlers report their progress through JobProgress, which also serves as the heartbeat used to requeue
+the jobs of crashed workers. A failed job is retried with an exponential delay until max_attempts is reached.
+"""
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from trade_network.cache import invalidate_network
+from trade_network.export import EXPORT_FORMATS, export_queryset
+from trade_network.ledger import debt_summary, write_off_debts
+from trade_network.models import Job, Node
+
+CHUNK_SIZE: int = 1000
+HANDLERS: Dict[str, Callable[[Job, "JobProgress"], Any]] = {}
+
+
+def register(kind: str) -> Callable:
+    """
+    The register function takes as an argument the kind of a job. Returns a decorator that registers
+    the decorated function as the handler of the jobs of this kind.
+    """
+    def decorator(handler: Callable[[Job, "JobProgress"], Any]) -> Callable[[Job, "JobProgress"], Any]:
+        HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+class JobProgress:
+    """
+    The JobProgress class is passed to the job handlers. Records the progress of the running job
+    and refreshes its heartbeat.
+    """
+    def __init__(self, job: Job) -> None:
+        self.job: Job = job
+
+    def update(self, processed: int, total: Optional[int] = None) -> None:
+        """
+        The update function takes as arguments the number of processed items and optionally their total.
+        Saves them together with a new heartbeat.
+        """
+        fields: dict = {"processed": processed, "heartbeat": timezone.now()}
+        if total is not None:
+            fields["total"] = total
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self.job, name, value)
+
+
+def enqueue(kind: str, params: Optional[dict] = None, user=None, max_attempts: int = 3) -> Job:
+    """
+    The enqueue function takes as arguments the kind of a job, its parameters, the user who requested it
+    and the number of attempts. Raises a ValueError for an unknown kind. Returns the queued job.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}.")
+    return Job.objects.create(kind=kind, params=params or {}, max_attempts=max_attempts,
+                              created_by=user if user is not None and user.is_authenticated else None)
+
+
+def worker_name() -> str:
+    """
+    The worker_name function returns the name of the current worker process.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(worker: str) -> Optional[Job]:
+    """
+    The claim_job function takes as an argument the name of the worker. Marks the oldest due queued job
+    as running by this worker. Concurrent workers skip the rows locked by each other where the database
+    supports it, and the conditional update makes sure only one of them wins a job. Returns the job or None.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job: Optional[Job] = (Job.objects.select_for_update(skip_locked=True)
+                              .filter(status=Job.QUEUED, run_after__lte=now).order_by("id").first())
+        if job is None:
+            return None
+        claimed: int = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, attempts=F("attempts") + 1, started=now, heartbeat=now,
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job: Job) -> Job:
+    """
+    The run_job function takes as an argument a claimed job. Runs its handler and records the result.
+    A failed job is queued again after a delay that doubles with every attempt, or marked as failed
+    once it has used all its attempts. Returns the job.
+    """
+    handler: Optional[Callable] = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}.")
+        result = handler(job, JobProgress(job))
+    except Exception:
+        fields: dict = {"error": traceback.format_exc(), "worker": ""}
+        if handler is not None and job.attempts < job.max_attempts:
+            delay: int = getattr(settings, "JOB_RETRY_DELAY", 30) * 2 ** (job.attempts - 1)
+            fields.update(status=Job.QUEUED, run_after=timezone.now() + timedelta(seconds=delay))
+        else:
+            fields.update(status=Job.FAILED, finished=timezone.now())
+    else:
+        fields = {"status": Job.SUCCEEDED, "result": result, "error": "", "finished": timezone.now()}
+    Job.objects.filter(pk=job.pk).update(**fields)
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    The requeue_stale_jobs function queues again the running jobs whose heartbeat is older than
+    JOB_STALE_SECONDS, because their worker has died. Jobs without attempts left are marked as failed.
+    Returns the number of affected jobs.
+    """
+    now = timezone.now()
+    stale: QuerySet = Job.objects.filter(
+        status=Job.RUNNING, heartbeat__lt=now - timedelta(seconds=getattr(settings, "JOB_STALE_SECONDS", 600))
+    )
+    failed: int = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, error="The worker stopped responding.", finished=now,
+    )
+    return failed + stale.update(status=Job.QUEUED, worker="", run_after=now)
+
+
+def selected_nodes(params: dict) -> QuerySet:
+    """
+    The selected_nodes function takes as an argument the parameters of a job. Returns the queryset
+    of all members if "all" is set, otherwise of the members listed in "node_ids".
+    """
+    if params.get("all"):
+        return Node.objects.all()
+    return Node.objects.filter(id__in=params.get("node_ids", []))
+
+
+@register("clear_debts")
+def clear_debts(job: Job, progress: JobProgress) -> dict:
+    """
+    The clear_debts function is the handler of the "clear_debts" jobs. Writes off the debts of the selected
+    members through the debt ledger in chunks of "chunk_size" members (DEBT_CLEAR_CHUNK_SIZE by default),
+    each chunk in its own short transaction, pausing DEBT_CLEAR_PAUSE seconds between chunks so concurrent
+    writers waiting for the locks get their turn. A retried job continues where it stopped, since cleared members
+    are skipped. With "dry_run" only the totals are computed. Returns the totals.
+    """
+    queryset: QuerySet = selected_nodes(job.params).filter(debt_to_the_supplier__gt=0).order_by("id")
+    if job.params.get("dry_run"):
+        members, amount = debt_summary(queryset)
+        progress.update(members, members)
+        return {"dry_run": True, "members": members, "amount": str(amount)}
+
+    chunk_size: int = job.params.get("chunk_size", getattr(settings, "DEBT_CLEAR_CHUNK_SIZE", CHUNK_SIZE))
+    pause: float = getattr(settings, "DEBT_CLEAR_PAUSE", 0)
+    progress.update(0, queryset.count())
+
+    cleared, amount, last_id = 0, Decimal(0), 0
+    while True:
+        ids: list = list(queryset.filter(id__gt=last_id).values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            break
+        count, total = write_off_debts(Node.objects.filter(id__in=ids), comment=job.params.get("comment", ""))
+        cleared, amount, last_id = cleared + count, amount + total, ids[-1]
+        progress.update(job.processed + len(ids))
+        if pause:
+            time.sleep(pause)
+    return {"cleared": cleared, "amount": str(amount)}
+
+
+@register("export_network")
+def export_network(job: Job, progress: JobProgress) -> dict:
+    """
+    The export_network function is the handler of the "export_network" jobs. Writes the trading network,
+    optionally only the members listed in "node_ids" or of the "country", as NDJSON or CSV selected by "type" to a file
+    in JOB_EXPORT_DIR. The file appears under its final name only when it is complete. Returns its name.
+    """
+    export_type: str = job.params.get("type", "ndjson")
+    if export_type not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export type: {export_type}.")
+    queryset: QuerySet = selected_nodes(job.params) if "node_ids" in job.params else Node.objects.all()
+    if job.params.get("country"):
+        queryset = queryset.filter(contact__country=job.params["country"])
+    progress.update(0, queryset.count() if export_type == "ndjson" else export_queryset(queryset).count() + 1)
+
+    directory: str = str(getattr(settings, "JOB_EXPORT_DIR", "exports"))
+    os.makedirs(directory, exist_ok=True)
+    name: str = f"trade_network-{job.pk}.{export_type}"
+    _, iterate = EXPORT_FORMATS[export_type]
+    lines: int = 0
+    with open(os.path.join(directory, f"{name}.part"), "w", encoding="utf-8", newline="") as file:
+        for line in iterate(queryset):
+            file.write(line)
+            lines += 1
+            if lines % CHUNK_SIZE == 0:
+                progress.update(lines)
+    os.replace(os.path.join(directory, f"{name}.part"), os.path.join(directory, name))
+    progress.update(lines)
+    return {"file": name, "lines": lines}
+
+
+@register("rebuild_hierarchy")
+def rebuild_hierarchy(job: Job, progress: JobProgress) -> dict:
+    """
+    The rebuild_hierarchy function is the handler of the "rebuild_hierarchy" jobs. Recomputes the materialized
+    paths and levels of all members from their supplier links, top-down, and saves the changed ones in chunks.
+    Members caught in a supplier cycle are left as they are and counted. Returns the totals.
+    """
+    rows: Dict[int, tuple] = {pk: (supplier_id, path, level) for pk, supplier_id, path, level
+                              in Node.objects.values_list("id", "supplier_id", "path", "level").iterator()}
+    progress.update(0, len(rows))
+    paths: Dict[int, str] = {}
+    pending: list = sorted(rows)
+    while pending:
+        postponed: list = []
+        for pk in pending:
+            supplier_id = rows[pk][0]
+            if supplier_id is None:
+                paths[pk] = "/"
+            elif supplier_id in paths:
+                paths[pk] = f"{paths[supplier_id]}{supplier_id}/"
+            else:
+                postponed.append(pk)
+        if len(postponed) == len(pending):
+            break
+        pending = postponed
+
+    changed: list = [Node(id=pk, path=path, level=path.count("/") - 1) for pk, path in paths.items()
+                     if (path, path.count("/") - 1) != rows[pk][1:]]
+    for start in range(0, len(changed), CHUNK_SIZE):
+        with transaction.atomic():
+            Node.objects.bulk_update(changed[start:start + CHUNK_SIZE], ["path", "level"])
+        progress.update(len(rows) - len(changed) + min(len(changed), start + CHUNK_SIZE))
+    if changed:
+        invalidate_network()
+    progress.update(len(rows))
+    return {"updated": len(changed), "in_cycles": len(rows) - len(paths)}
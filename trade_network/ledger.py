@@ -0,0 +1,95 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet, Sum
+
+from trade_network.cache import invalidate_network
+from trade_network.models import DebtTransaction, Node
+from trade_network.serializers import DebtPostingSerializer
+
+BATCH_SIZE: int = 1000
+
+
+def apply_transactions(entries: List[DebtTransaction]) -> None:
+    """
+    The apply_transactions function takes as an argument a list of unsaved ledger entries. Must be called
+    inside a transaction. Inserts the entries with bulk_create and moves the balance of every affected member
+    with one F() increment per member, in the order of primary keys, so a hot member is locked once per batch
+    and concurrent batches never deadlock.
+    """
+    deltas: Dict[int, Decimal] = defaultdict(Decimal)
+    for entry in entries:
+        deltas[entry.node_id] += entry.delta
+
+    DebtTransaction.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    for node_id in sorted(deltas):
+        if deltas[node_id]:
+            Node.objects.filter(id=node_id).update(debt_to_the_supplier=F("debt_to_the_supplier") + deltas[node_id])
+
+
+def post_transactions(postings: Iterable[dict]) -> Tuple[int, List[dict]]:
+    """
+    The post_transactions function takes as an argument an iterable of postings with the node, kind, amount
+    and optional comment. Validates all postings and checks the referenced members with one query.
+    Posts nothing if any posting is invalid. Returns the number of posted entries and the list of per-row errors.
+    """
+    errors: List[dict] = []
+    rows: List[Tuple[int, DebtTransaction]] = []
+    for index, posting in enumerate(postings):
+        serializer = DebtPostingSerializer(data=posting)
+        if serializer.is_valid():
+            rows.append((index, DebtTransaction(**serializer.validated_data)))
+        else:
+            errors.append({"row": index, "errors": serializer.errors})
+
+    node_ids: set = {entry.node_id for _, entry in rows}
+    existing: set = set(Node.objects.filter(id__in=node_ids).values_list("id", flat=True))
+    for index, entry in rows:
+        if entry.node_id not in existing:
+            errors.append({"row": index, "errors": {"node": [f"Node {entry.node_id} does not exist."]}})
+    if errors:
+        return 0, sorted(errors, key=lambda error: error["row"])
+
+    with transaction.atomic():
+        apply_transactions([entry for _, entry in rows])
+        invalidate_network()
+    return len(rows), []
+
+
+def debt_summary(queryset: QuerySet) -> Tuple[int, Decimal]:
+    """
+    The debt_summary function takes as an argument a queryset of the Node class. Computes with one aggregate
+    query, without locking anything, how many of the selected members have a debt and its total amount.
+    Returns the number of members and the total, the preview of write_off_debts.
+    """
+    summary: dict = queryset.filter(debt_to_the_supplier__gt=0).aggregate(
+        members=Count("id"), amount=Sum("debt_to_the_supplier")
+    )
+    return summary["members"], (summary["amount"] or Decimal(0)).quantize(Decimal("0.01"))
+
+
+def write_off_debts(queryset: QuerySet, comment: str = "") -> Tuple[int, Decimal]:
+    """
+    The write_off_debts function takes as arguments a queryset of the Node class and an optional comment.
+    Writes off the whole current debt of the selected members through the ledger, so every cleared amount,
+    the balance before the write-off, stays on record. The balances are read under row locks and zeroed with
+    a single UPDATE, so the locks are held for two statements whatever the size of the selection; large
+    selections should be passed in chunks. Negative balances, which are credits and not debts, are left as they are.
+    Returns the number of members whose debt was cleared and the total amount.
+    """
+    with transaction.atomic():
+        balances: List[Tuple[int, Decimal]] = list(
+            Node.objects.filter(id__in=queryset.values("id"), debt_to_the_supplier__gt=0)
+            .select_for_update().order_by("id").values_list("id", "debt_to_the_supplier")
+        )
+        if not balances:
+            return 0, Decimal(0)
+        DebtTransaction.objects.bulk_create([
+            DebtTransaction(node_id=node_id, kind=DebtTransaction.WRITE_OFF, amount=debt, comment=comment)
+            for node_id, debt in balances
+        ], batch_size=BATCH_SIZE)
+        Node.objects.filter(id__in=[node_id for node_id, _ in balances]).update(debt_to_the_supplier=0)
+        invalidate_network()
+    return len(balances), sum((debt for _, debt in balances), Decimal(0))
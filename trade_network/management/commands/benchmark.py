@@ -0,0 +1,183 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, connections
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from trade_network.benchmark import COUNTRIES, connection_lifetime, generate_network, measure, measure_codecs
+from trade_network.models import Node
+from trade_network.serializers import NodeListSerializer
+
+USERNAME: str = "benchmark"
+PASSWORD: str = "benchmark-Pa55word"
+CONNECTION_MODES: Dict[str, Optional[int]] = {
+    "node_retrieve_new_connection": 0,
+    "node_retrieve_persistent_connection": None,
+}
+
+
+def git_commit() -> Optional[str]:
+    """
+    The git_commit function returns the hash of the current git commit, or None outside of a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=settings.BASE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """
+    The Command class inherits from the BaseCommand class from django.core.management.base.
+    Creates a throwaway test database on the configured backend, fills it with a synthetic network
+    and measures throughput and latency of the hot API paths in process. The retrieve endpoint is measured once more
+    with a new connection per request and with a persistent connection to show the latency saved by connection
+    reuse; with an in-memory SQLite test database the two are the same. The JSON renderers and parsers are measured
+    on a large page of members. The results are written as JSON,
+    so runs on different commits or database backends can be compared.
+    """
+    help: str = "Benchmark the hot API paths of trade_network and user on a synthetic network"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--factories", type=int, default=20)
+        parser.add_argument("--chains", type=int, default=200)
+        parser.add_argument("--proprietors", type=int, default=2000)
+        parser.add_argument("--products", type=int, default=3, help="Products per member of the network")
+        parser.add_argument("--iterations", type=int, default=200, help="Calls per scenario")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--page-size", type=int, default=1000, help="Members per page in the codec benchmark")
+        parser.add_argument("--cache", action="store_true", help="Keep response caching enabled")
+        parser.add_argument("--output", help="File the JSON results are written to, stdout by default")
+
+    def handle(self, *args, **options) -> None:
+        old_name: str = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        for alias in getattr(settings, "READ_REPLICAS", []):
+            connections[alias].close()
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            with override_settings(THROTTLE_ENABLED=False):
+                if options["cache"]:
+                    results: dict = self.run(options)
+                else:
+                    with override_settings(CACHES={
+                        **settings.CACHES, "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+                    }):
+                        results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report: str = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report)
+            self.stdout.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(report)
+
+    def run(self, options: dict) -> dict:
+        """
+        The run function takes as an argument the options of the command. Generates the network
+        and runs every scenario. Returns the results together with the metadata of the run.
+        """
+        network: Dict[str, List[int]] = generate_network(
+            options["factories"], options["chains"], options["proprietors"], options["products"], options["seed"]
+        )
+        get_user_model().objects.create_user(username=USERNAME, password=PASSWORD)
+        client: APIClient = APIClient()
+        client.login(username=USERNAME, password=PASSWORD)
+
+        iterations: int = options["iterations"]
+        suppliers: List[str] = list(Node.objects.filter(id__in=network["chains"] or network["factories"])
+                                    .values_list("name", flat=True))
+        created: List[int] = []
+        members: List[int] = network["sole_proprietors"] or network["chains"] or network["factories"]
+
+        def check(response, status: int):
+            if response.status_code != status:
+                raise RuntimeError(f"{response.request['PATH_INFO']} returned {response.status_code}: "
+                                   f"{response.content[:500]!r}")
+            return response
+
+        def create(number: int) -> None:
+            response = check(client.post("/trade_network/node", {
+                "name": f"bench-created-{number}", "supplier": suppliers[number % len(suppliers)],
+                "contact": {"email": f"created-{number}@example.com", "country": COUNTRIES[number % len(COUNTRIES)],
+                            "city": "Moscow", "street": "Lenina", "house_number": "1"},
+            }, format="json"), 201)
+            created.append(response.data["id"])
+
+        scenarios: Dict[str, Callable[[int], object]] = {
+            "node_create": create,
+            "node_list_country": lambda number: check(client.get(
+                "/trade_network/node/list", {"contact__country": COUNTRIES[number % len(COUNTRIES)], "limit": 100}
+            ), 200),
+            "node_list_sparse_compact": lambda number: check(client.get("/trade_network/node/list", {
+                "contact__country": COUNTRIES[number % len(COUNTRIES)], "limit": 100,
+                "fields": "id,name,level", "format": "compact",
+            }), 200),
+            "node_retrieve": lambda number: check(client.get(
+                f"/trade_network/node/{members[number % len(members)]}"
+            ), 200),
+            "node_update": lambda number: check(client.patch(
+                f"/trade_network/node/{members[number % len(members)]}", {"name": f"bench-updated-{number}"},
+                format="json"
+            ), 200),
+            "node_delete": lambda number: check(client.delete(f"/trade_network/node/{created[number]}"), 204),
+            "user_login": lambda number: check(APIClient().post(
+                "/user/login", {"username": USERNAME, "password": PASSWORD}, format="json"
+            ), 200),
+            "user_profile": lambda number: check(client.get("/user/profile"), 200),
+        }
+        results: Dict[str, dict] = {}
+        for name, scenario in scenarios.items():
+            results[name] = measure(scenario, iterations)
+            self.report(name, results[name])
+
+        for name, max_age in CONNECTION_MODES.items():
+            with connection_lifetime(max_age) as per_request:
+                results[name] = measure(per_request(scenarios["node_retrieve"]), iterations)
+            self.report(name, results[name])
+        new, persistent = (results[name] for name in CONNECTION_MODES)
+
+        page: list = NodeListSerializer(
+            Node.objects.select_related("supplier", "contact")[:options["page_size"]], many=True
+        ).data
+        codecs: dict = measure_codecs(page, iterations)
+        for kind in ("render", "parse"):
+            for name, result in codecs[kind].items():
+                self.report(f"{kind}_{name}", result)
+
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "cache": options["cache"],
+                "iterations": iterations,
+                "seed": options["seed"],
+                "network": {**{kind: len(ids) for kind, ids in network.items()},
+                            "products_per_node": options["products"]},
+            },
+            "scenarios": results,
+            "codecs": {**codecs, "page_size": len(page)},
+            "connection_reuse_saved_ms": {statistic: new[statistic] - persistent[statistic]
+                                          for statistic in ("mean_ms", "p50_ms", "p99_ms")},
+        }
+
+    def report(self, name: str, result: dict) -> None:
+        """
+        The report function takes as arguments the name of a scenario and its results. Prints a summary line.
+        """
+        self.stderr.write(f"{name}: {result['throughput']:.1f} calls/s, "
+                          f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
@@ -0,0 +1,55 @@
+from typing import Callable, Dict
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.db.models import QuerySet
+
+from trade_network.models import Node, Contact, Product, normalize_location
+
+
+def hot_queries(value: str) -> Dict[str, Callable[[], QuerySet]]:
+    """
+    The hot_queries function takes as an argument the value used in the filters and searches.
+    Returns the querysets of the hot paths of the API and the admin panel by their description.
+    """
+    return {
+        "node list, contact__country filter": lambda: Node.objects.select_related("supplier", "contact").filter(
+            contact__country=value),
+        "node list, contact__country__iexact filter": lambda: Node.objects.filter(contact__country__iexact=value),
+        "node list, contact__city__iexact filter": lambda: Node.objects.filter(contact__city__iexact=value),
+        "admin node changelist, contact__city filter": lambda: Node.objects.filter(contact__city=value),
+        "admin node changelist, city filter choices": lambda: Contact.objects.values_list(
+            "city", flat=True).distinct().order_by("city"),
+        "admin node search by name": lambda: Node.objects.filter(name__icontains=value),
+        "admin product search by name or model": lambda: Product.objects.filter(name__icontains=value)
+        | Product.objects.filter(model__icontains=value),
+        "node search, country keys": lambda: Node.objects.filter(
+            contact__country_key__in=[normalize_location(value)]).order_by("-debt_to_the_supplier", "-id")[:100],
+        "node search, city key prefix": lambda: Node.objects.filter(
+            contact__city_key__startswith=normalize_location(value)[:3]).order_by("-debt_to_the_supplier", "-id")[:100],
+        "node subtree by path": lambda: Node.objects.filter(path__startswith="/1/"),
+        "node keyset page": lambda: Node.objects.filter(level__gte=1).order_by("level", "id")[:100],
+    }
+
+
+class Command(BaseCommand):
+    """
+    The Command class inherits from the BaseCommand class from django.core.management.base.
+    Prints the query plan of every hot query of the trading network so index regressions are visible.
+    """
+    help: str = "Print EXPLAIN output for the hot queries of the trading network"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--value", default="Moscow", help="Value used in the filters and searches")
+        parser.add_argument("--analyze", action="store_true", help="Run EXPLAIN ANALYZE (PostgreSQL only)")
+
+    def handle(self, *args, **options) -> None:
+        explain_options: dict = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        for description, build in hot_queries(options["value"]).items():
+            queryset: QuerySet = build()
+            self.stdout.write(self.style.MIGRATE_HEADING(description))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from trade_network.export import CHUNK_SIZE, EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    """
+    The Command class inherits from the BaseCommand class from django.core.management.base.
+    Writes the whole trading network with contacts, supplier names and products as NDJSON or CSV
+    to a file or to the standard output, reading the database through a server-side cursor.
+    """
+    help: str = "Export the trading network as NDJSON or CSV"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--output", help="Path of the output file, the standard output by default")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options) -> None:
+        _, iterate = EXPORT_FORMATS[options["format"]]
+        if options["output"] is None:
+            self._write(sys.stdout, iterate, options["chunk_size"])
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            self._write(output, iterate, options["chunk_size"])
+
+    def _write(self, output, iterate, chunk_size: int) -> None:
+        for line in iterate(chunk_size=chunk_size):
+            output.write(line)
@@ -0,0 +1,86 @@
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from trade_network.benchmark import percentile
+
+PATHS: Dict[str, Tuple[str, str]] = {
+    "list": ("/trade_network/node/list?limit={limit}", "/trade_network/async/node/list?limit={limit}"),
+    "retrieve": ("/trade_network/node/{pk}", "/trade_network/async/node/{pk}"),
+}
+
+
+class Command(BaseCommand):
+    """
+    The Command class inherits from the BaseCommand class from django.core.management.base.
+    Fires concurrent GET requests at a running server, once at the sync and once at the async read endpoints,
+    and prints throughput and latency percentiles for both. Run the server under an ASGI server,
+    for example "uvicorn test_task_1.asgi:application --workers 1", to compare the two paths.
+    """
+    help: str = "Compare throughput and latency of the sync and async read endpoints of a running server"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--username", required=True)
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--endpoint", choices=list(PATHS), default="retrieve")
+        parser.add_argument("--pk", default="1", help="Primary key used by the retrieve endpoint")
+        parser.add_argument("--limit", type=int, default=100, help="Page size used by the list endpoint")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    def handle(self, *args, **options) -> None:
+        credentials: str = base64.b64encode(f"{options['username']}:{options['password']}".encode()).decode()
+        headers: Dict[str, str] = {"Authorization": f"Basic {credentials}"}
+
+        results: Dict[str, dict] = {}
+        for mode, template in zip(("sync", "async"), PATHS[options["endpoint"]]):
+            url: str = options["base_url"].rstrip("/") + template.format(pk=options["pk"], limit=options["limit"])
+            results[mode] = self.run(url, headers, options["concurrency"], options["requests"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:>5}: {result['throughput']:.1f} req/s, p50 {result['p50_ms']:.1f} ms, "
+                f"p99 {result['p99_ms']:.1f} ms, errors {result['errors']}"
+            )
+
+    def run(self, url: str, headers: Dict[str, str], concurrency: int, total: int) -> dict:
+        """
+        The run function takes as arguments the url, the request headers, the number of concurrent clients
+        and the total number of requests. Returns the throughput, latency percentiles and number of errors.
+        """
+        def fetch(_: int) -> Tuple[float, bool]:
+            started: float = time.perf_counter()
+            try:
+                with urlopen(Request(url, headers=headers), timeout=30) as response:
+                    response.read()
+                    ok: bool = response.status == 200
+            except (HTTPError, URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started: float = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples: List[Tuple[float, bool]] = list(executor.map(fetch, range(total)))
+        elapsed: float = time.perf_counter() - started
+
+        latencies: List[float] = [latency * 1000 for latency, ok in samples if ok]
+        return {
+            "url": url,
+            "requests": total,
+            "concurrency": concurrency,
+            "errors": sum(1 for _, ok in samples if not ok),
+            "throughput": total / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.5),
+            "p99_ms": percentile(latencies, 0.99),
+        }
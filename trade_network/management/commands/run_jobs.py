@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from trade_network.jobs import claim_job, requeue_stale_jobs, run_job, worker_name
+from trade_network.models import Job
+
+
+class Command(BaseCommand):
+    """
+    The Command class inherits from the BaseCommand class from django.core.management.base.
+    Runs the background jobs of the trading network from the database queue. Any number of workers
+    can run side by side; each job is claimed by exactly one of them.
+    """
+    help: str = "Run the queued background jobs of the trading network"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--burst", action="store_true", help="Exit when there are no due jobs left")
+        parser.add_argument("--max-jobs", type=int, help="Exit after running this many jobs")
+        parser.add_argument("--poll-interval", type=float, default=getattr(settings, "JOB_POLL_INTERVAL", 2.0),
+                            help="Seconds to wait between polls of an empty queue")
+
+    def handle(self, *args, **options) -> None:
+        worker: str = worker_name()
+        done: int = 0
+        try:
+            while options["max_jobs"] is None or done < options["max_jobs"]:
+                close_old_connections()
+                requeue_stale_jobs()
+                job: Optional[Job] = claim_job(worker)
+                if job is None:
+                    if options["burst"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                started: float = time.perf_counter()
+                job = run_job(job)
+                done += 1
+                self.stdout.write(f"{job} {job.status} after attempt {job.attempts} "
+                                  f"in {time.perf_counter() - started:.1f} s")
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped, the running job is queued again once its heartbeat expires.")
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0003_alter_contact_options_alter_product_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='node',
+            options={'ordering': ['level', 'id'], 'verbose_name': 'trading network member', 'verbose_name_plural': 'trading network members'},
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['level', 'id'], name='node_level_id_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:02
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    """
+    Builds the materialized paths of the existing members of the trading network from the top of the hierarchy.
+    """
+    Node = apps.get_model('trade_network', 'Node')
+    paths = {}
+    pending = list(Node.objects.order_by('level', 'id').values_list('id', 'supplier_id'))
+    while pending:
+        postponed = []
+        for pk, supplier_id in pending:
+            if supplier_id is None:
+                paths[pk] = '/'
+            elif supplier_id in paths:
+                paths[pk] = f'{paths[supplier_id]}{supplier_id}/'
+            else:
+                postponed.append((pk, supplier_id))
+        if len(postponed) == len(pending):
+            break
+        pending = postponed
+
+    nodes = [Node(id=pk, path=path, level=path.count('/') - 1) for pk, path in paths.items()]
+    Node.objects.bulk_update(nodes, ['path', 'level'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0004_node_level_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
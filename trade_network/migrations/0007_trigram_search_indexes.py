@@ -0,0 +1,40 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('node_name_trgm_idx', 'trade_network_node', 'name'),
+    ('product_name_trgm_idx', 'trade_network_product', 'name'),
+    ('product_model_trgm_idx', 'trade_network_product', 'model'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates GIN trigram indexes on UPPER(column), the expression PostgreSQL lookups icontains and istartswith
+    compare against, so the admin search is served from the index instead of a sequential scan.
+    Other database backends are skipped.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0006_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
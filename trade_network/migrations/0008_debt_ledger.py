@@ -0,0 +1,45 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def open_balances(apps, schema_editor):
+    """
+    Records the debt of the existing members as opening charges, so the ledger of every member sums to its balance.
+    """
+    Node = apps.get_model('trade_network', 'Node')
+    DebtTransaction = apps.get_model('trade_network', 'DebtTransaction')
+    DebtTransaction.objects.bulk_create(
+        [DebtTransaction(node_id=node_id, kind='charge', amount=debt, comment='opening balance')
+         for node_id, debt in Node.objects.exclude(debt_to_the_supplier=0).values_list('id', 'debt_to_the_supplier')],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0007_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('charge', 'charge'), ('payment', 'payment'), ('write_off', 'write-off')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('comment', models.CharField(blank=True, default='', max_length=300)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='debt_transactions', to='trade_network.node')),
+            ],
+            options={
+                'verbose_name': 'debt transaction',
+                'verbose_name_plural': 'debt transactions',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['node', 'id'], name='debt_transaction_node_idx')],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
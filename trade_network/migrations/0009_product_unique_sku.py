@@ -0,0 +1,37 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:11
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_products(apps, schema_editor):
+    """
+    Stops the migration if some owner has several products with the same name and model, listing them,
+    so an operator can decide which rows to keep before the unique constraint is added. No row is deleted.
+    """
+    Product = apps.get_model('trade_network', 'Product')
+    duplicates = list(Product.objects.values('owner', 'name', 'model').order_by('owner', 'name', 'model')
+                      .annotate(count=Count('id')).filter(count__gt=1))
+    if duplicates:
+        groups = "\n".join(f"  owner={row['owner']} name={row['name']!r} model={row['model']!r}: {row['count']} rows"
+                           for row in duplicates[:50])
+        more = f"\n  ... and {len(duplicates) - 50} more groups" if len(duplicates) > 50 else ""
+        raise RuntimeError(
+            f"Cannot add the unique (owner, name, model) constraint of products, duplicate groups found: "
+            f"{len(duplicates)}. Merge or delete the duplicate rows and run the migration again:\n{groups}{more}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0008_debt_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_products, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('owner', 'name', 'model'), name='product_owner_name_model_uniq'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:25
+
+from django.db import migrations, models
+
+
+def fill_location_keys(apps, schema_editor):
+    """
+    Fills in the normalized country and city keys of the existing contacts.
+    """
+    Contact = apps.get_model('trade_network', 'Contact')
+    batch = []
+    for contact in Contact.objects.only('id', 'country', 'city').iterator(chunk_size=1000):
+        contact.country_key = ' '.join((contact.country or '').split()).casefold()
+        contact.city_key = ' '.join((contact.city or '').split()).casefold()
+        batch.append(contact)
+        if len(batch) == 1000:
+            Contact.objects.bulk_update(batch, ['country_key', 'city_key'])
+            batch = []
+    Contact.objects.bulk_update(batch, ['country_key', 'city_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0009_product_unique_sku'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='city_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='country_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_location_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['country_key', 'city_key'], name='contact_location_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['debt_to_the_supplier', 'id'], name='node_debt_id_idx'),
+        ),
+    ]
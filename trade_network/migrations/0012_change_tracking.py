@@ -0,0 +1,68 @@
+# Generated by Django 4.2.3 on 2026-10-17 15:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_node_updated_at(apps, schema_editor):
+    """
+    Starts the modification time of the existing members of the trading network at their creation time.
+    """
+    Node = apps.get_model('trade_network', 'Node')
+    Node.objects.update(updated_at=models.F('date_of_creation'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0011_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_node_updated_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('node', 'node'), ('contact', 'contact'), ('product', 'product')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'tombstone',
+                'verbose_name_plural': 'tombstones',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='node',
+            index=models.Index(fields=['updated_at', 'id'], name='node_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['updated_at', 'id'], name='contact_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'id'], name='product_updated_idx'),
+        ),
+    ]
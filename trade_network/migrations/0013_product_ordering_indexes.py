@@ -0,0 +1,25 @@
+# Generated by Django 4.2.3 on 2026-10-17 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_network', '0012_change_tracking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_release_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['release_date', 'id'], name='product_release_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['selling_price', 'id'], name='product_price_id_idx'),
+        ),
+    ]
@@ -1,6 +1,45 @@
 from datetime import datetime
-from typing import List
-from django.db import models
+from decimal import Decimal
+from typing import List, Optional
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Max, QuerySet, Value
+from django.db.models.functions import Concat, Substr, Upper
+from django.utils import timezone
+
+MAX_LEVEL: int = 2
+
+
+def with_updated_at(update_fields):
+    """
+    The with_updated_at function takes as an argument the update_fields argument of Model.save.
+    Returns it with the updated_at field added, so partial saves move the modification time too.
+    """
+    if update_fields:
+        return {*update_fields, "updated_at"}
+    return update_fields
+
+
+class TrackedQuerySet(QuerySet):
+    """
+    The TrackedQuerySet class inherits from the QuerySet class from the django.db.models module.
+    Moves the updated_at field of the rows changed by bulk updates and upserts that bypass Model.save,
+    so the change feed sees every change.
+    """
+    def update(self, **kwargs) -> int:
+        kwargs.setdefault("updated_at", timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        return super().bulk_update(objs, {*fields, "updated_at"}, *args, **kwargs)
+
+    def bulk_create(self, objs, *args, update_fields=None, **kwargs):
+        return super().bulk_create(objs, *args, update_fields=with_updated_at(update_fields), **kwargs)
 
 
 class Node(models.Model):
@@ -13,6 +52,10 @@ class Node(models.Model):
     level = models.IntegerField(choices=[(0, 0), (1, 1), (2, 2)])
     debt_to_the_supplier = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     date_of_creation = models.DateTimeField(auto_now_add=True)
+    path = models.CharField(max_length=255, default='/', editable=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
 
     def __str__(self) -> str:
         """
@@ -28,22 +71,131 @@ class Node(models.Model):
         """
         verbose_name: str = 'trading network member'
         verbose_name_plural: str = 'trading network members'
-        ordering: List[str] = ['level']
+        ordering: List[str] = ['level', 'id']
+        indexes: List[models.Index] = [
+            models.Index(fields=['level', 'id'], name='node_level_id_idx'),
+            models.Index(fields=['debt_to_the_supplier', 'id'], name='node_debt_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='node_updated_idx'),
+        ]
+
+    def clean(self) -> None:
+        """
+        The clean function overrides the method of the parent class, so model forms such as the admin ones
+        check the hierarchy. Raises a ValidationError exception if the supplier is the instance itself or one
+        of its customers, or if the instance or its subtree would go below the lowest level.
+        """
+        super().clean()
+        if self.supplier is None:
+            return
+        if self.id and (self.supplier.id == self.id or f'/{self.id}/' in self.supplier.path):
+            raise ValidationError({"supplier": "Supplier can not be the member itself or its customer."})
+
+        height: int = 0
+        if self.id:
+            deepest: Optional[int] = self.get_descendants().aggregate(deepest=Max("level"))["deepest"]
+            height = deepest - self.level if deepest is not None else 0
+        if len(self.supplier.ancestor_ids()) + 1 + height > MAX_LEVEL:
+            raise ValidationError({"supplier": "Incorrect links in the hierarchical system"})
 
     def save(self, *args, **kwargs):
         """
         The save function adds additional functionality to the method of the parent class. Automatically fills
-        in fields when creating instances of the class. After that, it calls the method of the parent class.
+        in fields when creating instances of the class and keeps the materialized path of the subtree up to date.
+        An existing instance never writes debt_to_the_supplier, which is changed only through the debt ledger.
+        After that, it calls the method of the parent class.
         """
         if not self.id:
             self.date_of_creation = datetime.now()
-        return super().save(*args, **kwargs)
+
+        update_fields: Optional[List[str]] = with_updated_at(kwargs.get("update_fields"))
+        if update_fields is not None:
+            kwargs["update_fields"] = update_fields
+        if update_fields is not None and "supplier" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        old_prefix: Optional[str] = self.subtree_prefix if self.id else None
+        old_level: int = self.level
+        self.path = self.supplier.subtree_prefix if self.supplier is not None else '/'
+        self.level = self.path.count('/') - 1
+        if self.id and f'/{self.id}/' in self.path:
+            raise ValueError("Incorrect links in the hierarchical system")
+
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "path", "level"}
+        elif not self._state.adding and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [field.attname for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != "debt_to_the_supplier"]
+
+        with transaction.atomic():
+            result = super().save(*args, **kwargs)
+            if old_prefix is not None and old_prefix != self.subtree_prefix:
+                Node.objects.filter(path__startswith=old_prefix).update(
+                    path=Concat(Value(self.subtree_prefix), Substr('path', len(old_prefix) + 1)),
+                    level=F('level') + (self.level - old_level),
+                )
+        return result
+
+    @property
+    def subtree_prefix(self) -> str:
+        """
+        The subtree_prefix property returns the materialized path shared by all members of the trading network
+        located below this instance. Every descendant's path starts with this prefix.
+        """
+        return f'{self.path}{self.id}/'
+
+    def ancestor_ids(self) -> List[int]:
+        """
+        The ancestor_ids function returns the identifiers of the suppliers of this instance from the top
+        of the hierarchy down to the direct supplier, taken from the materialized path without database queries.
+        """
+        return [int(pk) for pk in self.path.strip('/').split('/') if pk]
+
+    def get_ancestors(self) -> QuerySet:
+        """
+        The get_ancestors function returns a queryset of the whole supplier chain of this instance
+        ordered from the top of the hierarchy. The chain is resolved by one query on the primary key.
+        """
+        return Node.objects.filter(id__in=self.ancestor_ids()).order_by('level')
+
+    def get_descendants(self) -> QuerySet:
+        """
+        The get_descendants function returns a queryset of all members of the trading network located below
+        this instance in the hierarchy. The subtree is resolved by one prefix query on the indexed path.
+        """
+        return Node.objects.filter(path__startswith=self.subtree_prefix)
+
+
+def normalize_location(value: Optional[str]) -> str:
+    """
+    The normalize_location function takes as an argument a free-text country or city name. Returns the search key
+    of the name: case-folded, with surrounding whitespace removed and inner whitespace collapsed to one space.
+    """
+    return " ".join((value or "").split()).casefold()
+
+
+class ContactQuerySet(TrackedQuerySet):
+    """
+    The ContactQuerySet class inherits from the TrackedQuerySet class. Keeps the normalized location keys
+    up to date for bulk inserts and updates that bypass Contact.save.
+    """
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for contact in objs:
+            contact.fill_location_keys()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def update(self, **kwargs) -> int:
+        for field in ("country", "city"):
+            if field in kwargs and (kwargs[field] is None or isinstance(kwargs[field], str)):
+                kwargs[f"{field}_key"] = normalize_location(kwargs[field])
+        return super().update(**kwargs)
 
 
 class Contact(models.Model):
     """
     The Contact class inherits from the Model base class from the django.db.models module.
-    Defines the fields of a database table, their properties and restrictions.
+    Defines the fields of a database table, their properties and restrictions. The country and city are also
+    stored as indexed normalized keys used by the location search.
     """
     memder = models.OneToOneField(Node, on_delete=models.CASCADE)
     email = models.EmailField(blank=True, null=True)
@@ -51,6 +203,11 @@ class Contact(models.Model):
     city = models.CharField(max_length=50, blank=True, null=True)
     street = models.CharField(max_length=50, blank=True, null=True)
     house_number = models.CharField(max_length=10, blank=True, null=True)
+    country_key = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True)
+    city_key = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ContactQuerySet.as_manager()
 
     class Meta:
         """
@@ -59,6 +216,34 @@ class Contact(models.Model):
         """
         verbose_name: str = 'contact'
         verbose_name_plural: str = 'contacts'
+        indexes: List[models.Index] = [
+            models.Index(fields=['country'], name='contact_country_idx'),
+            models.Index(fields=['city'], name='contact_city_idx'),
+            models.Index(Upper('country'), name='contact_country_upper_idx'),
+            models.Index(Upper('city'), name='contact_city_upper_idx'),
+            models.Index(fields=['country_key', 'city_key'], name='contact_location_key_idx'),
+            models.Index(fields=['updated_at', 'id'], name='contact_updated_idx'),
+        ]
+
+    def fill_location_keys(self) -> None:
+        """
+        The fill_location_keys function sets the normalized location keys from the country and city.
+        """
+        self.country_key = normalize_location(self.country)
+        self.city_key = normalize_location(self.city)
+
+    def save(self, *args, **kwargs):
+        """
+        The save function adds additional functionality to the method of the parent class. Fills in
+        the normalized location keys before calling the method of the parent class.
+        """
+        self.fill_location_keys()
+        update_fields = with_updated_at(kwargs.get("update_fields"))
+        if update_fields is not None and {"country", "city"} & set(update_fields):
+            update_fields = {*update_fields, "country_key", "city_key"}
+        if update_fields is not None:
+            kwargs["update_fields"] = update_fields
+        return super().save(*args, **kwargs)
 
 
 class Product(models.Model):
@@ -71,6 +256,9 @@ class Product(models.Model):
     release_date = models.DateField()
     owner = models.ForeignKey(Node, on_delete=models.CASCADE)
     selling_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
 
     def __str__(self) -> str:
         """
@@ -79,6 +267,15 @@ class Product(models.Model):
         """
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        The save function adds additional functionality to the method of the parent class.
+        Adds the modification time to partial saves before calling the method of the parent class.
+        """
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = with_updated_at(kwargs["update_fields"])
+        return super().save(*args, **kwargs)
+
     class Meta:
         """
         The Meta class contains the common name of the model instance in the singular and plural used
@@ -87,4 +284,133 @@ class Product(models.Model):
         verbose_name: str = 'product'
         verbose_name_plural: str = 'products'
         ordering: List[str] = ['name', 'model']
+        indexes: List[models.Index] = [
+            models.Index(fields=['name', 'model'], name='product_name_model_idx'),
+            models.Index(fields=['release_date', 'id'], name='product_release_id_idx'),
+            models.Index(fields=['selling_price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='product_updated_idx'),
+        ]
+        constraints: List[models.BaseConstraint] = [
+            models.UniqueConstraint(fields=['owner', 'name', 'model'], name='product_owner_name_model_uniq'),
+        ]
+
+
+
+class Tombstone(models.Model):
+    """
+    The Tombstone class inherits from the Model base class from the django.db.models module.
+    Records the deletion of a member of the trading network, a contact or a product, so the change feed
+    can report deletions to the systems that sync from it.
+    """
+    NODE: str = 'node'
+    CONTACT: str = 'contact'
+    PRODUCT: str = 'product'
+    KINDS: List[tuple] = [(NODE, 'node'), (CONTACT, 'contact'), (PRODUCT, 'product')]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        """
+        The Meta class contains the common name of the model instance in the singular and plural used
+        in the administration panel.
+        """
+        verbose_name: str = 'tombstone'
+        verbose_name_plural: str = 'tombstones'
+        ordering: List[str] = ['id']
+        indexes: List[models.Index] = [models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx')]
+
 
+class DebtTransaction(models.Model):
+    """
+    The DebtTransaction class inherits from the Model base class from the django.db.models module.
+    Defines an append-only entry of the debt ledger of a member of the trading network. The current balance
+    is kept in Node.debt_to_the_supplier and is changed only together with new entries.
+    """
+    CHARGE: str = 'charge'
+    PAYMENT: str = 'payment'
+    WRITE_OFF: str = 'write_off'
+    KINDS: List[tuple] = [(CHARGE, 'charge'), (PAYMENT, 'payment'), (WRITE_OFF, 'write-off')]
+
+    node = models.ForeignKey(Node, related_name='debt_transactions', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    comment = models.CharField(max_length=300, blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        The Meta class contains the common name of the model instance in the singular and plural used
+        in the administration panel.
+        """
+        verbose_name: str = 'debt transaction'
+        verbose_name_plural: str = 'debt transactions'
+        ordering: List[str] = ['id']
+        indexes: List[models.Index] = [models.Index(fields=['node', 'id'], name='debt_transaction_node_idx')]
+
+    @property
+    def delta(self) -> Decimal:
+        """
+        The delta property returns the change of the debt made by this entry: charges increase the debt,
+        payments and write-offs decrease it.
+        """
+        return self.amount if self.kind == self.CHARGE else -self.amount
+
+
+class Job(models.Model):
+    """
+    The Job class inherits from the Model base class from the django.db.models module.
+    Defines a heavy operation queued for the background worker, its progress and its outcome.
+    The queue is the table itself, so no outside broker is needed.
+    """
+    QUEUED: str = 'queued'
+    RUNNING: str = 'running'
+    SUCCEEDED: str = 'succeeded'
+    FAILED: str = 'failed'
+    STATUSES: List[tuple] = [(QUEUED, 'queued'), (RUNNING, 'running'), (SUCCEEDED, 'succeeded'), (FAILED, 'failed')]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    heartbeat = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        """
+        The __str__ function overrides the method of the parent class Model and creates
+        an output format for instances of this class.
+        """
+        return f'{self.kind} #{self.id}'
+
+    class Meta:
+        """
+        The Meta class contains the common name of the model instance in the singular and plural used
+        in the administration panel.
+        """
+        verbose_name: str = 'background job'
+        verbose_name_plural: str = 'background jobs'
+        ordering: List[str] = ['-id']
+        indexes: List[models.Index] = [models.Index(fields=['status', 'run_after', 'id'], name='job_queue_idx')]
+
+    @property
+    def percent(self) -> Optional[int]:
+        """
+        The percent property returns the progress of the job in percent, or None while the total is unknown.
+        """
+        if self.status == self.SUCCEEDED:
+            return 100
+        if not self.total:
+            return None
+        return min(100, self.processed * 100 // self.total)
@@ -0,0 +1,169 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    The KeysetPagination class inherits from the BasePagination class from rest_framework.pagination.
+    Paginates a queryset by a composite ordering whose last field is unique. Each page is
+    selected with a "greater than the last seen row" condition instead of an OFFSET scan, and the total
+    count is not computed, so every page costs the same regardless of its depth.
+    """
+    ordering: Tuple[str, ...] = ("id",)
+    cursor_query_param: str = "cursor"
+    page_size: int = 100
+    page_size_query_param: str = "limit"
+    max_page_size: int = 1000
+    invalid_cursor_message: str = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> List:
+        """
+        The paginate_queryset function overrides the base class method. It takes as arguments a queryset,
+        a request object and a view. Orders the queryset, applies the position from the received cursor
+        and fetches one row more than the page size to find out whether there is a next page.
+        Returns the list of objects of the current page.
+        """
+        self.request = request
+        self.limit: int = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position: Optional[list] = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        results: list = list(queryset[:self.limit + 1])
+        self.has_next: bool = len(results) > self.limit
+        self.page: list = results[:self.limit]
+        return self.page
+
+    def get_ordering(self, request) -> Tuple[str, ...]:
+        """
+        The get_ordering function takes as an argument a request object. Returns the ordering of the page,
+        the fixed ordering of the class by default.
+        """
+        return self.ordering
+
+    def get_page_size(self, request) -> int:
+        """
+        The get_page_size function takes as an argument a request object. Returns the page size requested
+        by the client, bounded by max_page_size, or the default page size.
+        """
+        try:
+            size: int = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def position_filter(self, position: list) -> Q:
+        """
+        The position_filter function takes as an argument the values of the ordering fields of the last seen row.
+        Builds a row comparison condition (a, b, c) > (x, y, z) expanded into lookups the ORM can use with
+        a composite index. Descending fields, prefixed with "-", are compared with "less than". Returns the Q object.
+        """
+        condition: Q = Q()
+        for index in reversed(range(len(self.ordering))):
+            field: str = self.ordering[index].lstrip("-")
+            lookup: str = "lt" if self.ordering[index].startswith("-") else "gt"
+            step: Q = Q(**{f"{field}__{lookup}": position[index]})
+            if index < len(self.ordering) - 1:
+                step |= Q(**{field: position[index]}) & condition
+            condition = step
+        return condition
+
+    def decode_cursor(self, request, model) -> Optional[list]:
+        """
+        The decode_cursor function takes as arguments a request object and the paginated model. Decodes the cursor
+        received in the query parameters and converts its values to the types of the ordering fields,
+        raises a NotFound exception if the cursor is malformed. Returns the list of the ordering field values
+        or None for the first page.
+        """
+        encoded: Optional[str] = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            return [model._meta.get_field(field.lstrip("-")).to_python(value)
+                    for field, value in zip(self.ordering, position)]
+        except (TypeError, ValueError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj) -> str:
+        """
+        The encode_cursor function takes as an argument the last object of the page.
+        Returns the cursor with the values of its ordering fields encoded in base64.
+        """
+        position: list = [getattr(obj, field.lstrip("-")) for field in self.ordering]
+        return b64encode(json.dumps(position, cls=DjangoJSONEncoder).encode("utf-8")).decode("ascii")
+
+    def get_next_link(self) -> Optional[str]:
+        """
+        The get_next_link function returns the absolute url of the next page or None for the last page.
+        """
+        if not self.has_next:
+            return None
+        url: str = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data) -> Response:
+        """
+        The get_paginated_response function overrides the base class method. It takes as an argument
+        serialized data of the page. Returns the response with the next page link and the results.
+        """
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """
+        The get_paginated_response_schema function overrides the base class method.
+        Returns the schema of the paginated response.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class NodeKeysetPagination(KeysetPagination):
+    """
+    The NodeKeysetPagination class inherits from the KeysetPagination class. Walks the members
+    of the trading network in the (level, id) order backed by the composite index of the Node model.
+    """
+    ordering: Tuple[str, ...] = ("level", "id")
+
+
+class ProductKeysetPagination(KeysetPagination):
+    """
+    The ProductKeysetPagination class inherits from the KeysetPagination class. Walks the catalog in the order
+    selected by the "ordering" query parameter, one of ORDERINGS optionally prefixed with "-" for the descending
+    order, with the primary key as the tiebreaker. Raises a ValidationError for other values.
+    """
+    ORDERINGS: Tuple[str, ...] = ("id", "name", "release_date", "selling_price")
+    ordering_query_param: str = "ordering"
+
+    def get_ordering(self, request) -> Tuple[str, ...]:
+        value: str = request.query_params.get(self.ordering_query_param, "id")
+        if value.lstrip("-") not in self.ORDERINGS:
+            raise ValidationError({self.ordering_query_param: [
+                f"Select one of: {', '.join(self.ORDERINGS)}, optionally prefixed with '-'."
+            ]})
+        if value.lstrip("-") == "id":
+            return (value,)
+        return value, "id"
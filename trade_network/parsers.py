@@ -0,0 +1,34 @@
+from typing import List
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from test_task_1.fastjson import loads
+
+
+class NDJSONParser(BaseParser):
+    """
+    The NDJSONParser class inherits from the BaseParser class from rest_framework.parsers. Parses a request body
+    of newline-delimited JSON documents line by line without loading the raw body as one string.
+    """
+    media_type: str = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> List[dict]:
+        """
+        The parse function overrides the base class method. It takes as arguments a request stream, a media type
+        and a parser context. Decodes every non-empty line as a separate JSON document, raises a ParseError
+        exception with the line number if a line is malformed. Returns the list of decoded documents.
+        """
+        parser_context = parser_context or {}
+        encoding: str = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        rows: List[dict] = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(loads(line if encoding.lower().replace("-", "") == "utf8" else line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+        return rows
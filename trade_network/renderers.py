@@ -0,0 +1,93 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+from test_task_1.fastjson import FastJSONRenderer
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, the format is offered only when it is installed
+    msgpack = None
+
+
+def _flatten(row: dict, prefix: str = "") -> Dict[str, Any]:
+    """
+    The _flatten function takes as arguments a serialized object and the prefix of its keys.
+    Returns the object with the keys of nested objects joined by dots, lists are kept as values.
+    """
+    flat: Dict[str, Any] = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def to_table(rows: List[dict]) -> Dict[str, list]:
+    """
+    The to_table function takes as an argument a list of serialized objects. Returns the column names
+    and one array of values per object, so the keys are sent once per page instead of once per object.
+    A nested object that is null on some rows yields nulls in its columns.
+    """
+    flat_rows: List[Dict[str, Any]] = [_flatten(row) for row in rows]
+    columns: Dict[str, None] = {}
+    for row in flat_rows:
+        columns.update(dict.fromkeys(row))
+    return {"columns": list(columns), "rows": [[row.get(column) for column in columns] for row in flat_rows]}
+
+
+class CompactJSONRenderer(FastJSONRenderer):
+    """
+    The CompactJSONRenderer class inherits from the FastJSONRenderer class from test_task_1.fastjson.
+    Renders lists of objects, plain or in the "results" of a page, as a table of columns and rows
+    without indentation or spaces. Other data is rendered as by the parent class. Selected with "?format=compact".
+    """
+    media_type: str = "application/vnd.trade-network.compact+json"
+    format: str = "compact"
+    compact: bool = True
+
+    def render(self, data, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> bytes:
+        if isinstance(data, list):
+            data = to_table(data)
+        elif isinstance(data, dict) and isinstance(data.get("results"), list):
+            data = {**data, "results": to_table(data["results"])}
+        return super().render(data, "application/json", renderer_context)
+
+
+def _msgpack_default(value):
+    """
+    The _msgpack_default function converts the values msgpack cannot pack: decimals to strings
+    and dates and times to ISO 8601 strings, as the JSON renderer does.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    The MessagePackRenderer class inherits from the BaseRenderer class from rest_framework.renderers.
+    Renders the data as MessagePack. Requires the optional msgpack package. Selected with "?format=msgpack".
+    """
+    media_type: str = "application/msgpack"
+    format: str = "msgpack"
+    charset: Optional[str] = None
+    render_style: str = "binary"
+
+    def render(self, data, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+NODE_RENDERER_CLASSES: list = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    CompactJSONRenderer,
+    *([MessagePackRenderer] if msgpack is not None else []),
+]
@@ -1,8 +1,13 @@
-from typing import Tuple, List, Dict
+from decimal import Decimal
+from typing import Tuple, List, Dict, Optional
 from django.db import models
+from django.db.models import QuerySet, Subquery
 from rest_framework import serializers
 
-from trade_network.models import Node, Contact
+from test_task_1.metrics import TimedSerializerMixin
+from trade_network.export import EXPORT_FORMATS
+from trade_network.fieldsets import SparseFieldsetMixin
+from trade_network.models import Node, Contact, Product, DebtTransaction, Job, Tombstone
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -20,13 +25,76 @@ class ContactSerializer(serializers.ModelSerializer):
         fields: List[str] = ["email", "country", "city", "street", "house_number"]
 
 
-class NodeCreateSerializer(serializers.ModelSerializer):
+MAX_LEVEL: int = 2
+
+
+class SupplierField(serializers.SlugRelatedField):
+    """
+    The SupplierField class inherits from the SlugRelatedField class from rest_framework.serializers.
+    Resolves the supplier by name with one query that also loads its materialized path and, when an existing
+    member is being updated, the deepest level of the member's subtree. The resolved supplier is shared
+    with the validation of the serializer, so the hierarchy is checked without further queries.
+    """
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault("slug_field", "name")
+        kwargs.setdefault("queryset", Node.objects.all())
+        super().__init__(**kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        """
+        The get_queryset function overrides the method of the parent class. Returns the queryset the supplier
+        is looked up in, annotated with the deepest level of the subtree of the updated member.
+        """
+        queryset: QuerySet = super().get_queryset().only("id", "name", "path", "level")
+        instance = getattr(self.parent, "instance", None)
+        if isinstance(instance, Node):
+            deepest = Node.objects.filter(path__startswith=instance.subtree_prefix).order_by("-level").values("level")
+            queryset = queryset.annotate(subtree_level=Subquery(deepest[:1]))
+        return queryset
+
+
+class NodeHierarchyValidationMixin:
+    """
+    The NodeHierarchyValidationMixin class is a mixin for the node serializers. Computes the level of the member
+    from the supplier resolved by SupplierField and rejects cycles and chains deeper than the hierarchy allows,
+    including the members below an updated member.
+    """
+    def validate(self, attrs: dict) -> dict:
+        """
+        The validate function overrides the method of the parent class. Takes the validated values of the fields.
+        Adds the "level" key when the supplier is given, raises a ValidationError exception if the supplier
+        is the member itself or one of its customers, or if the member or its subtree would go below
+        the lowest level. Returns the values.
+        """
+        attrs = super().validate(attrs)
+        if "supplier" not in attrs:
+            return attrs
+
+        supplier: Optional[Node] = attrs["supplier"]
+        instance: Optional[Node] = self.instance
+        level: int = 0 if supplier is None else len(supplier.ancestor_ids()) + 1
+
+        if instance is not None and supplier is not None:
+            if supplier.id == instance.id or f"/{instance.id}/" in supplier.path:
+                raise serializers.ValidationError({"supplier": "Supplier can not be the member itself or its customer."})
+
+        height: int = 0
+        if instance is not None and supplier is not None and supplier.subtree_level is not None:
+            height = supplier.subtree_level - instance.level
+        if level + height > MAX_LEVEL:
+            raise serializers.ValidationError({"supplier": "Incorrect links in the hierarchical system"})
+
+        attrs["level"] = level
+        return attrs
+
+
+class NodeCreateSerializer(TimedSerializerMixin, NodeHierarchyValidationMixin, serializers.ModelSerializer):
     """
     The NodeCreateSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the Node class when
     processing create new instance of Node class.
     """
-    supplier = serializers.SlugRelatedField(required=False, queryset=Node.objects.all(), slug_field="name")
+    supplier = SupplierField(required=False, allow_null=True, default=None)
     contact = ContactSerializer(required=False)
 
     class Meta:
@@ -35,18 +103,16 @@ class NodeCreateSerializer(serializers.ModelSerializer):
         defines the necessary parameters for the serializer to function.
         """
         model: models.Model = Node
-        read_only_fields: Tuple[str, ...] = ("id", "debt_to_the_supplier", "date_of_creation")
+        read_only_fields: Tuple[str, ...] = ("id", "debt_to_the_supplier", "date_of_creation", "level", "path")
         fields: str = "__all__"
 
     def is_valid(self, *, raise_exception=False):
         """
         The is_valid function overrides the base class method. It takes as arguments an instance of its own class
         and any other positional arguments. Removes the "contact" key with a value from the received data
-        and saves it as a protected attribute. Produces the addition of the "level" key with the value received
-        from the function.It then calls the base class method.
+        and saves it as a protected attribute. It then calls the base class method.
         """
         self._contact: Dict[str, str] = self.initial_data.pop("contact", {})
-        self.initial_data["level"] = level_detection(self.initial_data)
         return super().is_valid(raise_exception=raise_exception)
 
     def create(self, validated_data: dict) -> Node:
@@ -57,9 +123,7 @@ class NodeCreateSerializer(serializers.ModelSerializer):
         Returns the created instance of the Node class.
         """
         node: Node = Node.objects.create(**validated_data)
-        node.save()
-
-        contact: Contact = Contact.objects.create(
+        Contact.objects.create(
             memder=node,
             email=self._contact.get("email", None),
             country=self._contact.get("country", None),
@@ -67,19 +131,159 @@ class NodeCreateSerializer(serializers.ModelSerializer):
             street=self._contact.get("street", None),
             house_number=self._contact.get("house_number", None)
             )
-        contact.save()
 
         return node
 
 
-class NodeListSerializer(serializers.ModelSerializer):
+class ProductImportSerializer(serializers.ModelSerializer):
+    """
+    The ProductImportSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for validation of the products of a member of the trading network in the bulk import.
+    """
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Product
+        fields: List[str] = ["name", "model", "release_date", "selling_price"]
+
+
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The ProductSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for convenient serialization of objects of the Product class in the catalog API.
+    """
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Product
+        fields: List[str] = ["id", "owner", "name", "model", "release_date", "selling_price"]
+
+
+class ProductUpsertSerializer(serializers.ModelSerializer):
+    """
+    The ProductUpsertSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for validation of one row of the bulk upsert of the catalog. The owner is referenced
+    by its primary key and its existence is checked for the whole batch at once, so the serializer itself
+    never queries the database.
+    """
+    owner = serializers.IntegerField(source="owner_id")
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Product
+        fields: List[str] = ["owner", "name", "model", "release_date", "selling_price"]
+        validators: list = []
+
+
+class NodeImportSerializer(serializers.Serializer):
+    """
+    The NodeImportSerializer class inherits from the Serializer class from rest_framework.serializers.
+    This is a class for validation of one row of the bulk import of the trading network. The supplier is
+    referenced by name and is resolved against the database and the other rows of the import in one pass,
+    so the serializer itself never queries the database.
+    """
+    name = serializers.CharField(max_length=300)
+    supplier = serializers.CharField(max_length=300, required=False, allow_null=True, default=None)
+    contact = ContactSerializer(required=False)
+    products = ProductImportSerializer(many=True, required=False)
+
+    def validate_products(self, products: List[dict]) -> List[dict]:
+        """
+        The validate_products function checks that every product of the member has a unique name and model,
+        raises a ValidationError exception otherwise. Returns the products.
+        """
+        keys: set = {(product["name"], product["model"]) for product in products}
+        if len(keys) != len(products):
+            raise serializers.ValidationError("Products must have a unique name and model.")
+        return products
+
+
+class DebtPostingSerializer(serializers.ModelSerializer):
+    """
+    The DebtPostingSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for validation of one posting of the debt ledger. The member is referenced by its primary key
+    and its existence is checked for the whole batch at once, so the serializer itself never queries the database.
+    """
+    node = serializers.IntegerField(source="node_id")
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = DebtTransaction
+        fields: List[str] = ["node", "kind", "amount", "comment"]
+
+
+class DebtTransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The DebtTransactionSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for serialization of the entries of the debt ledger.
+    """
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = DebtTransaction
+        fields: List[str] = ["id", "node", "kind", "amount", "comment", "created"]
+
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The JobSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    This is a class for serialization of background jobs with their progress and outcome. Only the kind
+    and the parameters of a new job can be written.
+    """
+    percent = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Job
+        fields: List[str] = ["id", "kind", "params", "status", "processed", "total", "percent", "result", "error",
+                             "attempts", "created", "started", "finished"]
+        read_only_fields: List[str] = [field for field in fields if field not in ("kind", "params")]
+
+    def validate_params(self, params: dict) -> dict:
+        """
+        The validate_params function checks that the parameters are an object, that "node_ids" is a list
+        of integers, "chunk_size" a positive integer and "type" a supported export format, so a bad job
+        is rejected when it is queued instead of failing in the worker. Returns the parameters.
+        """
+        if not isinstance(params, dict):
+            raise serializers.ValidationError("Parameters must be an object.")
+        node_ids = params.get("node_ids", [])
+        if not isinstance(node_ids, list) or not all(type(pk) is int for pk in node_ids):
+            raise serializers.ValidationError({"node_ids": "Must be a list of integers."})
+        chunk_size = params.get("chunk_size", 1)
+        if type(chunk_size) is not int or chunk_size < 1:
+            raise serializers.ValidationError({"chunk_size": "Must be a positive integer."})
+        if params.get("type", "ndjson") not in EXPORT_FORMATS:
+            raise serializers.ValidationError({"type": f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+        return params
+
+
+class NodeListSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """
     The NodeListSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the Node class when
-    processing usage instance of Node class.
+    processing usage instance of Node class. Supports sparse fieldsets, the products are included on request.
     """
     supplier = serializers.SlugRelatedField(queryset=Node.objects.all(), slug_field="name")
     contact = ContactSerializer()
+    products = ProductSerializer(many=True, read_only=True, source="product_set")
+    expandable_fields: Tuple[str, ...] = ("products",)
 
     class Meta:
         """
@@ -87,17 +291,20 @@ class NodeListSerializer(serializers.ModelSerializer):
         defines the necessary parameters for the serializer to function.
         """
         model: models.Model = Node
-        fields: List[str] = ["id", "name", "level", "supplier", "debt_to_the_supplier", "contact"]
+        fields: List[str] = ["id", "name", "level", "supplier", "debt_to_the_supplier", "contact", "products"]
 
 
-class NodeSerializer(serializers.ModelSerializer):
+class NodeSerializer(TimedSerializerMixin, SparseFieldsetMixin, NodeHierarchyValidationMixin,
+                     serializers.ModelSerializer):
     """
     The NodeSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the Node class when
-    processing usage instance of Node class.
+    processing usage instance of Node class. Supports sparse fieldsets, the products are included on request.
     """
-    supplier = serializers.SlugRelatedField(required=False, queryset=Node.objects.all(), slug_field="name")
+    supplier = SupplierField(required=False, allow_null=True)
     contact = ContactSerializer(required=False)
+    products = ProductSerializer(many=True, read_only=True, source="product_set")
+    expandable_fields: Tuple[str, ...] = ("products",)
 
     class Meta:
         """
@@ -106,18 +313,15 @@ class NodeSerializer(serializers.ModelSerializer):
         """
         model: models.Model = Node
         fields: str = "__all__"
-        read_only_fields: Tuple[str, ...] = ("id", "debt_to_the_supplier", "date_of_creation", "level")
+        read_only_fields: Tuple[str, ...] = ("id", "debt_to_the_supplier", "date_of_creation", "level", "path")
 
     def is_valid(self, *, raise_exception=False):
         """
         The is_valid function overrides the base class method. It takes as arguments an instance of its own class
         and any other positional arguments. Removes the "contact" key with a value from the received data
-        and saves it as a protected attribute. Produces the addition of the "level" key with the value received
-        from the function.It then calls the base class method.
+        and saves it as a protected attribute. It then calls the base class method.
         """
         self._contact = self.initial_data.pop("contact", {})
-        if "supplier" in self.initial_data:
-            self.initial_data["level"] = level_detection(self.initial_data)
         return super().is_valid(raise_exception=raise_exception)
 
     def save(self):
@@ -134,27 +338,65 @@ class NodeSerializer(serializers.ModelSerializer):
         return self.instance
 
 
-def level_detection(kwargs: dict) -> int:
+class NodeChangeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
-    The level_detection function is a utility function. It takes as an argument data to create or update
-    an instance of the Node class. Specifies the hierarchical level of the location of an instance of the Node class.
-    Returns the level as an integer.
+    The NodeChangeSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    Serializes a changed member of the trading network for the change feed, without nested objects,
+    since contacts and products have their own streams.
     """
-    level: int = 0
-    if kwargs["supplier"] is None:
-        return level
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Node
+        fields: List[str] = ["id", "name", "supplier", "level", "path", "debt_to_the_supplier", "date_of_creation",
+                             "updated_at"]
 
-    supplier: Node = Node.objects.get(name=kwargs["supplier"])
 
-    for i in range(2):
-        level += 1
-        if supplier.supplier is None:
-            return level
-        supplier = supplier.supplier
+class ContactChangeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The ContactChangeSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    Serializes a changed contact for the change feed together with the member it belongs to.
+    """
+    node = serializers.IntegerField(source="memder_id")
 
-    raise Exception("Incorrect links in the hierarchical system")
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Contact
+        fields: List[str] = ["id", "node", "email", "country", "city", "street", "house_number", "updated_at"]
 
 
+class ProductChangeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The ProductChangeSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    Serializes a changed product for the change feed.
+    """
+    owner = serializers.IntegerField(source="owner_id")
+
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Product
+        fields: List[str] = ["id", "owner", "name", "model", "release_date", "selling_price", "updated_at"]
 
 
+class TombstoneSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    The TombstoneSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
+    Serializes a deletion reported by the change feed.
+    """
+    id = serializers.IntegerField(source="object_id")
 
+    class Meta:
+        """
+        The Meta class is an internal service class of the serializer,
+        defines the necessary parameters for the serializer to function.
+        """
+        model: models.Model = Tombstone
+        fields: List[str] = ["kind", "id", "deleted_at"]
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from trade_network.cache import invalidate_network
+from trade_network.models import Node, Contact, Product, Tombstone
+
+
+@receiver(pre_delete, sender=Node)
+def detach_subtree(sender, instance: Node, **kwargs) -> None:
+    """
+    The detach_subtree function is a receiver of the pre_delete signal of the Node class. The direct customers
+    of the deleted instance lose their supplier, so its whole subtree is moved to the top of the hierarchy
+    by one update of the materialized paths and levels. The path and the level are read from the database,
+    because deleting a supplier of the instance in the same call has already moved it.
+    """
+    current: Optional[dict] = Node.objects.filter(pk=instance.pk).values("path", "level").first()
+    if current is None:
+        return
+    prefix: str = f'{current["path"]}{instance.pk}/'
+    Node.objects.filter(path__startswith=prefix).update(
+        path=Concat(Value('/'), Substr('path', len(prefix) + 1)),
+        level=F('level') - (current["level"] + 1),
+    )
+
+
+@receiver(post_save, sender=Node)
+@receiver(post_save, sender=Contact)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Node)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Product)
+def invalidate_cached_responses(sender, **kwargs) -> None:
+    """
+    The invalidate_cached_responses function is a receiver of the post_save and post_delete signals
+    of the Node, Contact and Product classes. Marks the cached responses of the trading network as stale.
+    """
+    invalidate_network()
+
+
+@receiver(post_delete, sender=Node)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Product)
+def record_tombstone(sender, instance, **kwargs) -> None:
+    """
+    The record_tombstone function is a receiver of the post_delete signal of the Node, Contact and Product
+    classes. Records the deletion for the change feed. Cascade deletions send the signal for every row as well.
+    """
+    Tombstone.objects.create(kind=sender._meta.model_name, object_id=instance.pk)
@@ -0,0 +1,868 @@
+import json
+import tempfile
+from base64 import b64encode
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from trade_network.benchmark import generate_network, percentile
+from trade_network.jobs import HANDLERS, claim_job, enqueue, register, run_job
+from trade_network.ledger import debt_summary, post_transactions, write_off_debts
+from trade_network.models import Node, Contact, Product, DebtTransaction, Job
+from user.models import User
+
+
+def create_chain(prefix: str) -> Node:
+    """
+    The create_chain function is a utility function for tests. It takes as an argument a prefix for node names.
+    Creates a three-level supplier chain with a contact for every member. Returns the lowest member of the chain.
+    """
+    supplier = None
+    for level in range(3):
+        node = Node.objects.create(name=f"{prefix}-{level}", supplier=supplier, level=level)
+        Contact.objects.create(memder=node, country="RU", city="Moscow")
+        supplier = node
+    return supplier
+
+
+class NodeQueryBudgetTest(TestCase):
+    """
+    The NodeQueryBudgetTest class checks that the node read endpoints run a fixed number of SQL queries
+    regardless of how many members of the trading network are returned.
+    """
+    LIST_QUERIES: int = 2
+    RETRIEVE_QUERIES: int = 1
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+
+    def test_list_query_count_does_not_depend_on_page_size(self) -> None:
+        create_chain("small")
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get("/trade_network/node/list", {"limit": 100})
+        self.assertEqual(response.status_code, 200)
+
+        for i in range(10):
+            create_chain(f"big{i}")
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get("/trade_network/node/list", {"limit": 100})
+        self.assertEqual(len(response.data["results"]), 33)
+
+    def test_list_filtered_by_country(self) -> None:
+        create_chain("chain")
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get("/trade_network/node/list", {"contact__country": "RU", "limit": 100})
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_query_count(self) -> None:
+        node = create_chain("chain")
+        with self.assertNumQueries(self.RETRIEVE_QUERIES):
+            response = self.client.get(f"/trade_network/node/{node.pk}")
+        self.assertEqual(response.data["supplier"], "chain-1")
+        self.assertEqual(response.data["contact"]["city"], "Moscow")
+
+
+class NodeKeysetPaginationTest(TestCase):
+    """
+    The NodeKeysetPaginationTest class checks the opt-in cursor mode of the node list endpoint.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        for i in range(3):
+            create_chain(f"chain{i}")
+
+    def test_walks_whole_network_without_count(self) -> None:
+        seen: list = []
+        url: str = "/trade_network/node/list?pagination=cursor&limit=4"
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            seen.extend((row["level"], row["id"]) for row in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 9)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_cursor(self) -> None:
+        for cursor in ("garbage", b64encode(b'["a","b"]').decode(), b64encode(b'[[1],{}]').decode()):
+            response = self.client.get("/trade_network/node/list", {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class NodeHierarchyPathTest(TestCase):
+    """
+    The NodeHierarchyPathTest class checks that the materialized path of the Node model stays correct
+    when members of the trading network are created, moved and deleted.
+    """
+    def setUp(self) -> None:
+        self.retailer: Node = create_chain("a")
+        self.factory: Node = Node.objects.get(name="a-0")
+        self.chain: Node = Node.objects.get(name="a-1")
+
+    def test_ancestors_and_descendants(self) -> None:
+        with self.assertNumQueries(1):
+            self.assertEqual([node.name for node in self.retailer.get_ancestors()], ["a-0", "a-1"])
+        with self.assertNumQueries(1):
+            self.assertEqual({node.name for node in self.factory.get_descendants()}, {"a-1", "a-2"})
+
+    def test_moving_supplier_updates_subtree(self) -> None:
+        other: Node = Node.objects.create(name="b-0", supplier=None, level=0)
+        self.chain.supplier = other
+        self.chain.save()
+
+        self.retailer.refresh_from_db()
+        self.assertEqual(self.retailer.ancestor_ids(), [other.id, self.chain.id])
+        self.assertEqual(self.retailer.level, 2)
+        self.assertFalse(self.factory.get_descendants().exists())
+
+    def test_moving_to_root_updates_levels(self) -> None:
+        self.chain.supplier = None
+        self.chain.save()
+
+        self.retailer.refresh_from_db()
+        self.assertEqual((self.chain.level, self.retailer.level), (0, 1))
+        self.assertEqual(self.retailer.ancestor_ids(), [self.chain.id])
+
+    def test_cycle_is_rejected(self) -> None:
+        self.factory.supplier = self.retailer
+        with self.assertRaises(ValueError):
+            self.factory.save()
+
+    def test_clean_checks_hierarchy(self) -> None:
+        other: Node = Node.objects.create(name="b-0", supplier=None, level=0)
+        for node, supplier in ((self.factory, self.retailer), (other, self.retailer), (self.chain, self.chain)):
+            node.supplier = supplier
+            with self.assertRaises(ValidationError) as context:
+                node.full_clean()
+            self.assertIn("supplier", context.exception.message_dict)
+        self.chain.supplier = other
+        self.chain.full_clean()
+
+    def test_admin_level_is_read_only(self) -> None:
+        admin_client = Client()
+        admin_client.force_login(User.objects.create(username="admin", is_staff=True, is_superuser=True))
+        response = admin_client.get(f"/admin/trade_network/node/{self.retailer.pk}/change/")
+        self.assertNotIn("level", response.context["adminform"].form.fields)
+
+    def test_deleting_supplier_detaches_subtree(self) -> None:
+        self.factory.delete()
+
+        self.chain.refresh_from_db()
+        self.retailer.refresh_from_db()
+        self.assertEqual((self.chain.supplier, self.chain.level, self.chain.path), (None, 0, "/"))
+        self.assertEqual(self.retailer.ancestor_ids(), [self.chain.id])
+
+    def test_deleting_supplier_chain_together(self) -> None:
+        Node.objects.filter(id__in=[self.factory.id, self.chain.id]).delete()
+
+        self.retailer.refresh_from_db()
+        self.assertEqual((self.retailer.supplier, self.retailer.level, self.retailer.path), (None, 0, "/"))
+
+    def test_subtree_endpoint(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        response = client.get(f"/trade_network/node/{self.factory.pk}/subtree")
+        self.assertEqual([row["name"] for row in response.data], ["a-1", "a-2"])
+        response = client.get(f"/trade_network/node/{self.retailer.pk}/suppliers")
+        self.assertEqual([row["name"] for row in response.data], ["a-0", "a-1"])
+        for url in ("/trade_network/node/abc/subtree", "/trade_network/node/abc/suppliers"):
+            self.assertEqual(client.get(url).status_code, 404)
+
+
+class NodeImportTest(TestCase):
+    """
+    The NodeImportTest class checks the bulk import endpoint of the trading network.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.factory: Node = Node.objects.create(name="factory", level=0)
+
+    def test_import_resolves_levels_out_of_order(self) -> None:
+        rows: list = [
+            {"name": "shop", "supplier": "chain", "contact": {"country": "RU"},
+             "products": [{"name": "TV", "model": "X1", "release_date": "2023-01-01"}]},
+            {"name": "chain", "supplier": "factory"},
+            {"name": "plant"},
+        ]
+        response = self.client.post("/trade_network/node/import", rows, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"created": 3, "errors": []})
+        shop: Node = Node.objects.get(name="shop")
+        self.assertEqual((shop.level, shop.ancestor_ids()), (2, [self.factory.id, shop.supplier_id]))
+        self.assertEqual(shop.contact.country, "RU")
+        self.assertEqual(shop.product_set.count(), 1)
+
+    def test_import_reports_row_errors(self) -> None:
+        rows: list = [
+            {"name": "factory"},
+            {"name": "a", "supplier": "missing"},
+            {"name": "b", "supplier": "a"},
+            {"name": "c", "supplier": "factory"},
+            {"name": "d", "supplier": "c"},
+            {"name": "e", "supplier": "d"},
+            {"supplier": "factory"},
+        ]
+        response = self.client.post("/trade_network/node/import", rows, format="json")
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [0, 1, 2, 5, 6])
+
+    def test_import_ndjson_stream(self) -> None:
+        body: bytes = b'{"name": "chain", "supplier": "factory"}\n\n{"name": "shop", "supplier": "chain"}\n'
+        response = self.client.post("/trade_network/node/import", body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Node.objects.get(name="shop").level, 2)
+
+
+class NodeExportTest(TestCase):
+    """
+    The NodeExportTest class checks the streaming export of the trading network.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        retailer: Node = create_chain("a")
+        Product.objects.create(name="TV", model="X1", release_date="2023-01-01", owner=retailer)
+        Product.objects.create(name="TV", model="X2", release_date="2023-02-01", owner=retailer)
+
+    def test_ndjson_export_in_one_query(self) -> None:
+        response = self.client.get("/trade_network/node/export")
+        with self.assertNumQueries(1):
+            lines: list = b"".join(response.streaming_content).decode().splitlines()
+
+        rows: list = [json.loads(line) for line in lines]
+        self.assertEqual([row["name"] for row in rows], ["a-0", "a-1", "a-2"])
+        self.assertEqual(rows[2]["supplier"], "a-1")
+        self.assertEqual([product["model"] for product in rows[2]["products"]], ["X1", "X2"])
+
+    def test_csv_export(self) -> None:
+        response = self.client.get("/trade_network/node/export", {"type": "csv", "contact__country": "RU"})
+        lines: list = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(lines), 5)
+
+
+class NodeAggregateTest(TestCase):
+    """
+    The NodeAggregateTest class checks the aggregate endpoints of the trading network.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+        create_chain("b")
+        Node.objects.filter(level__gt=0).update(debt_to_the_supplier=10)
+        for model in ("X1", "X2"):
+            Product.objects.create(name="TV", model=model, release_date="2023-01-01", owner=self.retailer)
+
+    def test_group_by_level(self) -> None:
+        with self.assertNumQueries(2):
+            response = self.client.get("/trade_network/node/aggregates", {"group_by": "level"})
+
+        self.assertEqual([(row["level"], row["members"], row["products"]) for row in response.data],
+                         [(0, 2, 0), (1, 2, 0), (2, 2, 2)])
+        self.assertEqual(response.data[2]["total_debt"], 20)
+
+    def test_group_by_supplier_within_subtree(self) -> None:
+        factory: Node = Node.objects.get(name="a-0")
+        response = self.client.get("/trade_network/node/aggregates", {"group_by": "supplier", "root": factory.pk})
+
+        self.assertEqual([(row["supplier__name"], row["members"]) for row in response.data],
+                         [("a-0", 1), ("a-1", 1)])
+
+    def test_subtree_roll_up(self) -> None:
+        factory: Node = Node.objects.get(name="a-0")
+        response = self.client.get(f"/trade_network/node/{factory.pk}/subtree/aggregate")
+
+        self.assertEqual(response.data["members"], 2)
+        self.assertEqual(response.data["direct_customers"], 1)
+        self.assertEqual(response.data["total_debt"], 20)
+        self.assertEqual(response.data["products"], 2)
+        self.assertEqual(self.client.get("/trade_network/node/abc/subtree/aggregate").status_code, 404)
+
+
+class NodeCacheTest(TestCase):
+    """
+    The NodeCacheTest class checks the cached responses of the node read endpoints and their invalidation.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+
+    def test_cached_until_network_changes(self) -> None:
+        url: str = f"/trade_network/node/{self.retailer.pk}"
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+        Contact.objects.filter(memder=self.retailer).delete()
+        with self.assertNumQueries(1):
+            third = self.client.get(url)
+        self.assertIsNone(third.data["contact"])
+        self.assertNotEqual(third["ETag"], first["ETag"])
+
+    def test_conditional_get(self) -> None:
+        response = self.client.get("/trade_network/node/list")
+        response = self.client.get("/trade_network/node/list", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_admin_clear_debt_invalidates(self) -> None:
+        Node.objects.filter(pk=self.retailer.pk).update(debt_to_the_supplier=5)
+        cache.clear()
+        url: str = f"/trade_network/node/{self.retailer.pk}"
+        self.assertEqual(self.client.get(url).data["debt_to_the_supplier"], "5.00")
+
+        admin_client = Client()
+        admin_client.force_login(User.objects.create(username="admin", is_staff=True, is_superuser=True))
+        data: dict = {"action": "clear_dept", "_selected_action": [self.retailer.pk]}
+        preview = admin_client.post("/admin/trade_network/node/", data)
+        self.assertContains(preview, "<strong>5.00</strong>")
+        admin_client.post("/admin/trade_network/node/", {**data, "post": "yes"})
+        self.assertEqual(self.client.get(url).data["debt_to_the_supplier"], "5.00")
+        call_command("run_jobs", "--burst", stdout=StringIO())
+        self.assertEqual(self.client.get(url).data["debt_to_the_supplier"], "0.00")
+
+
+class NodeAdminChangelistTest(TestCase):
+    """
+    The NodeAdminChangelistTest class checks that the admin changelists run a fixed number of queries.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_login(User.objects.create(username="admin", is_staff=True, is_superuser=True))
+
+    def changelist_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_rows(self) -> None:
+        retailer: Node = create_chain("small")
+        Product.objects.create(name="TV", model="X1", release_date="2023-01-01", owner=retailer)
+        small: dict = {url: self.changelist_queries(url) for url in (
+            "/admin/trade_network/node/", "/admin/trade_network/product/", "/admin/trade_network/node/?contact__city=Moscow"
+        )}
+
+        for i in range(10):
+            retailer = create_chain(f"big{i}")
+            Product.objects.create(name="TV", model="X1", release_date="2023-01-01", owner=retailer)
+        for url, count in small.items():
+            self.assertEqual(self.changelist_queries(url), count, url)
+
+
+class AsyncNodeReadTest(TestCase):
+    """
+    The AsyncNodeReadTest class checks that the async read endpoints return the same data as the sync ones.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.user: User = User.objects.create(username="staff", is_active=True)
+        self.retailer: Node = create_chain("a")
+        create_chain("b")
+
+    async def test_async_matches_sync(self) -> None:
+        await sync_to_async(self.async_client.force_login)(self.user)
+        await sync_to_async(self.client.force_login)(self.user)
+        for url in (f"/node/{self.retailer.pk}", "/node/list", "/node/list?limit=2&offset=2&contact__country=RU"):
+            sync_response = await sync_to_async(self.client.get)(f"/trade_network{url}")
+            async_response = await self.async_client.get(f"/trade_network/async{url}")
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(
+                json.loads(async_response.content),
+                json.loads(sync_response.content.replace(b"/trade_network/", b"/trade_network/async/")),
+            )
+
+    async def test_requires_authentication(self) -> None:
+        response = await self.async_client.get("/trade_network/async/node/list")
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {
+        "user": "100/min", "anon": "100/min", "list": "2/min",
+    }})
+    async def test_list_budget(self) -> None:
+        await sync_to_async(self.async_client.force_login)(self.user)
+        responses: list = [await self.async_client.get("/trade_network/async/node/list") for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertEqual((responses[1]["RateLimit-Limit"], responses[1]["RateLimit-Remaining"]), ("2", "0"))
+        self.assertEqual(responses[2]["Retry-After"], "30")
+        response = await self.async_client.get(f"/trade_network/async/node/{self.retailer.pk}")
+        self.assertEqual(response.status_code, 200)
+        await sync_to_async(self.client.force_login)(self.user)
+        self.assertEqual((await sync_to_async(self.client.get)("/trade_network/node/list")).status_code, 429)
+
+
+class DebtLedgerTest(TestCase):
+    """
+    The DebtLedgerTest class checks the debt ledger and its bulk posting endpoint.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+        self.chain: Node = self.retailer.supplier
+
+    def test_bulk_posting_moves_balances(self) -> None:
+        postings: list = [{"node": self.retailer.pk, "kind": "charge", "amount": "100.50"} for _ in range(50)]
+        postings += [{"node": self.retailer.pk, "kind": "payment", "amount": "25"},
+                     {"node": self.chain.pk, "kind": "charge", "amount": "10"}]
+        with self.assertNumQueries(6):
+            response = self.client.post("/trade_network/ledger", postings, format="json")
+
+        self.assertEqual(response.data["posted"], 52)
+        self.retailer.refresh_from_db()
+        self.assertEqual(self.retailer.debt_to_the_supplier, Decimal("5000.00"))
+        response = self.client.get(f"/trade_network/node/{self.retailer.pk}/ledger", {"limit": 10})
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(self.client.get("/trade_network/node/abc/ledger").status_code, 404)
+
+    def test_invalid_batch_posts_nothing(self) -> None:
+        postings: list = [{"node": self.retailer.pk, "kind": "charge", "amount": "10"},
+                          {"node": 0, "kind": "charge", "amount": "10"},
+                          {"node": self.retailer.pk, "kind": "gift", "amount": "-1"}]
+        response = self.client.post("/trade_network/ledger", postings, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1, 2])
+        self.assertFalse(DebtTransaction.objects.exists())
+
+    def test_save_does_not_overwrite_balance(self) -> None:
+        stale: Node = Node.objects.get(pk=self.retailer.pk)
+        self.client.post("/trade_network/ledger", [{"node": self.retailer.pk, "kind": "charge", "amount": "7"}],
+                         format="json")
+        stale.name = "renamed"
+        stale.save()
+
+        self.retailer.refresh_from_db()
+        self.assertEqual((self.retailer.name, self.retailer.debt_to_the_supplier), ("renamed", Decimal("7.00")))
+
+    def test_write_off_records_entries(self) -> None:
+        Node.objects.filter(pk=self.retailer.pk).update(debt_to_the_supplier=12)
+        self.assertEqual(write_off_debts(Node.objects.all()), (1, Decimal(12)))
+        self.assertEqual(DebtTransaction.objects.get().kind, DebtTransaction.WRITE_OFF)
+        self.assertFalse(Node.objects.exclude(debt_to_the_supplier=0).exists())
+
+    def test_write_off_keeps_credits(self) -> None:
+        Node.objects.filter(pk=self.retailer.pk).update(debt_to_the_supplier=12)
+        Node.objects.filter(pk=self.chain.pk).update(debt_to_the_supplier=-5)
+        self.assertEqual(debt_summary(Node.objects.all()), (1, Decimal("12.00")))
+        self.assertEqual(write_off_debts(Node.objects.all()), (1, Decimal(12)))
+
+        self.chain.refresh_from_db()
+        self.assertEqual(self.chain.debt_to_the_supplier, Decimal("-5.00"))
+        self.assertEqual(list(DebtTransaction.objects.values_list("node", "amount")), [(self.retailer.pk, 12)])
+
+
+class ProductCatalogTest(TestCase):
+    """
+    The ProductCatalogTest class checks the product catalog API and its bulk upsert.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+
+    def test_upsert_inserts_and_updates(self) -> None:
+        rows: list = [{"owner": self.retailer.pk, "name": "TV", "model": f"X{i}", "release_date": "2023-01-01",
+                       "selling_price": "100"} for i in range(20)]
+        response = self.client.post("/trade_network/product/upsert", rows, format="json")
+        self.assertEqual(response.data, {"written": 20, "errors": []})
+
+        rows[0]["selling_price"] = "150"
+        rows.append({"owner": 0, "name": "TV", "model": "X0", "release_date": "2023-01-01"})
+        with self.assertNumQueries(4):
+            response = self.client.post("/trade_network/product/upsert", rows, format="json")
+        self.assertEqual(response.data["errors"][0]["row"], 20)
+        self.assertEqual(Product.objects.count(), 20)
+        self.assertEqual(Product.objects.get(model="X0").selling_price, Decimal("150"))
+
+    def test_upsert_keeps_fields_not_sent(self) -> None:
+        row: dict = {"owner": self.retailer.pk, "name": "TV", "model": "X1", "release_date": "2023-01-01"}
+        self.client.post("/trade_network/product/upsert", [{**row, "selling_price": "9.50"}], format="json")
+        response = self.client.post("/trade_network/product/upsert", [{**row, "release_date": "2023-02-01"},
+                                                                      {**row, "model": "X2"}], format="json")
+        self.assertEqual(response.data, {"written": 2, "errors": []})
+        self.assertEqual(list(Product.objects.order_by("model").values_list("release_date", "selling_price")),
+                         [(date(2023, 2, 1), Decimal("9.50")), (date(2023, 1, 1), Decimal("0"))])
+
+    def test_list_filters_and_pages(self) -> None:
+        for i in range(5):
+            Product.objects.create(owner=self.retailer, name="TV", model=f"X{i}", release_date=f"2023-0{i + 1}-01",
+                                   selling_price=i * 10)
+        response = self.client.get("/trade_network/product/list", {
+            "owner": self.retailer.pk, "released_after": "2023-02-01", "max_price": 30, "limit": 2,
+        })
+        self.assertEqual([row["model"] for row in response.data["results"]], ["X1", "X2"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["model"] for row in response.data["results"]], ["X3"])
+
+    def test_list_ordering(self) -> None:
+        for i, price in enumerate((30, 10, 30, 20)):
+            Product.objects.create(owner=self.retailer, name="TV", model=f"X{i}", release_date="2023-01-01",
+                                   selling_price=price)
+        models: list = []
+        url: str = "/trade_network/product/list?ordering=-selling_price&limit=2"
+        while url:
+            response = self.client.get(url)
+            models += [row["model"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(models, ["X0", "X2", "X3", "X1"])
+        self.assertEqual(self.client.get("/trade_network/product/list", {"ordering": "owner"}).status_code, 400)
+
+
+class NodeHierarchyValidationTest(TestCase):
+    """
+    The NodeHierarchyValidationTest class checks the supplier resolution and the hierarchy checks
+    of the node create and update endpoints.
+    """
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+        self.chain: Node = self.retailer.supplier
+        create_chain("b")
+
+    def supplier_lookups(self, context: CaptureQueriesContext) -> int:
+        return sum(1 for query in context.captured_queries
+                   if query["sql"].startswith("SELECT") and '"name" =' in query["sql"] and "LIMIT 21" in query["sql"])
+
+    def test_create_resolves_supplier_once(self) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/trade_network/node", {"name": "shop", "supplier": "a-1"}, format="json")
+
+        self.assertEqual((response.status_code, response.data["level"]), (201, 2))
+        self.assertEqual(self.supplier_lookups(context), 1)
+
+    def test_create_without_supplier_and_too_deep(self) -> None:
+        response = self.client.post("/trade_network/node", {"name": "plant"}, format="json")
+        self.assertEqual((response.status_code, response.data["level"]), (201, 0))
+
+        response = self.client.post("/trade_network/node", {"name": "kiosk", "supplier": "a-2"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_move_updates_subtree_levels(self) -> None:
+        factory: Node = Node.objects.get(name="b-0")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(f"/trade_network/node/{self.chain.pk}", {"supplier": "b-0"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.supplier_lookups(context), 1)
+        self.retailer.refresh_from_db()
+        self.assertEqual((self.retailer.level, self.retailer.ancestor_ids()), (2, [factory.pk, self.chain.pk]))
+
+    def test_move_rejects_cycles_and_deep_subtrees(self) -> None:
+        factory: Node = Node.objects.get(name="a-0")
+        response = self.client.patch(f"/trade_network/node/{factory.pk}", {"supplier": "a-2"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch(f"/trade_network/node/{self.chain.pk}", {"supplier": "b-1"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch(f"/trade_network/node/{self.retailer.pk}", {"supplier": "b-1"}, format="json")
+        self.assertEqual((response.status_code, response.data["level"]), (200, 2))
+
+
+class BenchmarkNetworkTest(TestCase):
+    """
+    The BenchmarkNetworkTest class checks that the synthetic network of the benchmark suite
+    is reproducible and consistent with the materialized paths.
+    """
+    def test_generate_network(self) -> None:
+        network = generate_network(factories=2, chains=5, sole_proprietors=20, products_per_node=2, seed=7)
+
+        self.assertEqual({kind: len(ids) for kind, ids in network.items()},
+                         {"factories": 2, "chains": 5, "sole_proprietors": 20})
+        self.assertEqual((Contact.objects.count(), Product.objects.count()), (27, 54))
+        for node in Node.objects.select_related("supplier"):
+            expected = "/" if node.supplier is None else node.supplier.subtree_prefix
+            self.assertEqual((node.path, node.level), (expected, expected.count("/") - 1))
+
+    def test_percentile(self) -> None:
+        self.assertEqual(percentile(list(range(100)), 0.5), 50)
+        self.assertEqual(percentile(list(range(100)), 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+class NodeSparseFieldsetTest(TestCase):
+    """
+    The NodeSparseFieldsetTest class checks the "fields" and "expand" query parameters of the node endpoints,
+    the trimmed SQL behind them and the compact response format.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.node = create_chain("a")
+        Product.objects.create(owner=self.node, name="phone", model="X", release_date="2023-01-01")
+
+    def test_fields_trim_columns_and_joins(self) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/trade_network/node/list", {"fields": "id,name,level", "limit": 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data["results"][0]), {"id", "name", "level"})
+        page_sql: str = context.captured_queries[-1]["sql"]
+        self.assertNotIn("JOIN", page_sql)
+        self.assertNotIn("debt_to_the_supplier", page_sql)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/trade_network/node/list", {"fields": "id", "pagination": "cursor"})
+        self.assertEqual((len(response.data["results"]), len(context)), (3, 1))
+
+    def test_expand_products(self) -> None:
+        response = self.client.get("/trade_network/node/list", {"limit": 10})
+        self.assertEqual((set(response.data["results"][0]) >= {"contact", "supplier"},
+                          "products" in response.data["results"][0]), (True, False))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"/trade_network/node/{self.node.pk}",
+                                       {"fields": "id,name", "expand": "contact,products"})
+        self.assertEqual(len(context), 2)
+        self.assertEqual(response.data["contact"]["city"], "Moscow")
+        self.assertEqual([product["name"] for product in response.data["products"]], ["phone"])
+
+        response = self.client.get("/trade_network/node/list", {"fields": "id,secret"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_compact_format(self) -> None:
+        response = self.client.get("/trade_network/node/list", {"fields": "id,name,contact", "format": "compact",
+                                                                 "limit": 10})
+
+        self.assertEqual(response.status_code, 200)
+        table: dict = json.loads(response.content)["results"]
+        self.assertEqual(table["columns"][:3], ["id", "name", "contact.email"])
+        self.assertEqual(len(table["rows"]), 3)
+
+
+class NodeLocationSearchTest(TestCase):
+    """
+    The NodeLocationSearchTest class checks the normalized location keys of contacts and the location search
+    endpoint built on them.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        places = [("Russia", " Moscow "), ("russia", "Murmansk"), ("Kazakhstan", "Almaty"), ("Belarus", "Minsk")]
+        for number, (country, city) in enumerate(places):
+            node = Node.objects.create(name=f"member-{number}", level=0)
+            Contact.objects.create(memder=node, country=country, city=city)
+            Node.objects.filter(pk=node.pk).update(debt_to_the_supplier=number)
+
+    def search(self, **params) -> list:
+        response = self.client.get("/trade_network/node/search", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.data]
+
+    def test_location_keys(self) -> None:
+        contact: Contact = Contact.objects.get(memder__name="member-0")
+        self.assertEqual((contact.country_key, contact.city_key), ("russia", "moscow"))
+
+        Contact.objects.filter(pk=contact.pk).update(city="  Saint   Petersburg")
+        contact.refresh_from_db()
+        self.assertEqual(contact.city_key, "saint petersburg")
+
+    def test_search(self) -> None:
+        self.assertEqual(self.search(country="RUSSIA,belarus"), ["member-3", "member-1", "member-0"])
+        self.assertEqual(self.search(city="m", match="prefix", ordering="name"), ["member-0", "member-1", "member-3"])
+        self.assertEqual(self.search(country="kaz,bel", match="prefix", city="al"), ["member-2"])
+        self.assertEqual(self.search(country="kaz,bel", match="prefix", city="al,min"), ["member-3", "member-2"])
+        self.assertEqual(self.search(city="mosc"), [])
+
+
+class JobQueueTest(TestCase):
+    """
+    The JobQueueTest class checks the background job queue: queueing from the API, the worker command,
+    progress reporting, retries and the download of exports.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="admin", is_staff=True, is_active=True))
+        self.retailers: list = [create_chain(prefix) for prefix in "abc"]
+        Node.objects.update(debt_to_the_supplier=2)
+
+    def tearDown(self) -> None:
+        HANDLERS.pop("broken", None)
+
+    def run_worker(self) -> None:
+        call_command("run_jobs", "--burst", stdout=StringIO())
+
+    def test_clear_debts(self) -> None:
+        response = self.client.post("/trade_network/job", {"kind": "clear_debts",
+                                                           "params": {"all": True, "chunk_size": 4}}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], Job.QUEUED)
+        self.assertEqual(Node.objects.exclude(debt_to_the_supplier=0).count(), 9)
+
+        self.run_worker()
+        job = self.client.get(f"/trade_network/job/{response.data['id']}").data
+        self.assertEqual(job["status"], Job.SUCCEEDED)
+        self.assertEqual((job["processed"], job["total"], job["percent"]), (9, 9, 100))
+        self.assertEqual(job["result"], {"cleared": 9, "amount": "18.00"})
+        self.assertFalse(Node.objects.exclude(debt_to_the_supplier=0).exists())
+        self.assertEqual(DebtTransaction.objects.count(), 9)
+
+    def test_unknown_kind_and_permissions(self) -> None:
+        response = self.client.post("/trade_network/job", {"kind": "nothing"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.assertEqual(self.client.post("/trade_network/job", {"kind": "clear_debts"}, format="json").status_code, 403)
+
+    def test_invalid_params(self) -> None:
+        for params in ([1, 2], {"node_ids": "1"}, {"node_ids": [1, "a"]}, {"chunk_size": "10"}, {"chunk_size": 0},
+                       {"chunk_size": True}, {"type": "xml"}):
+            response = self.client.post("/trade_network/job", {"kind": "clear_debts", "params": params}, format="json")
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("params", response.data)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_retry_then_fail(self) -> None:
+        @register("broken")
+        def broken(job: Job, progress) -> None:
+            raise RuntimeError("boom")
+
+        job: Job = enqueue("broken", max_attempts=2)
+        job = run_job(claim_job("test"))
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn("boom", job.error)
+        job = run_job(claim_job("test"))
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNone(claim_job("test"))
+
+    @override_settings(DEBT_CLEAR_CHUNK_SIZE=2)
+    def test_clear_debts_in_chunks(self) -> None:
+        Node.objects.filter(pk=self.retailers[0].pk).update(debt_to_the_supplier=7)
+        preview: Job = enqueue("clear_debts", {"all": True, "dry_run": True})
+        self.run_worker()
+        preview.refresh_from_db()
+        self.assertEqual(preview.result, {"dry_run": True, "members": 9, "amount": "23.00"})
+        self.assertFalse(DebtTransaction.objects.exists())
+
+        job: Job = enqueue("clear_debts", {"node_ids": [node.pk for node in self.retailers]})
+        with CaptureQueriesContext(connection) as context:
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"cleared": 3, "amount": "11.00"})
+        self.assertEqual(sum(query["sql"].startswith('UPDATE "trade_network_node"')
+                             for query in context.captured_queries), 2)
+        self.assertEqual(list(DebtTransaction.objects.order_by("node_id").values_list("node_id", "amount")),
+                         [(node.pk, Decimal(amount)) for node, amount in zip(self.retailers, (7, 2, 2))])
+
+    def test_admin_preview(self) -> None:
+        admin_client = Client()
+        admin_client.force_login(User.objects.create(username="root", is_staff=True, is_superuser=True))
+        data: dict = {"action": "clear_dept", "_selected_action": [self.retailers[0].pk], "select_across": "1"}
+        response = admin_client.post("/admin/trade_network/node/", {**data, "index": "0"})
+        self.assertContains(response, "<strong>9</strong> members, <strong>18.00</strong>")
+        self.assertContains(response, '<input type="hidden" name="select_across" value="1">')
+        self.assertFalse(Job.objects.exists())
+
+        admin_client.post("/admin/trade_network/node/", {**data, "post": "yes"})
+        self.assertEqual(Job.objects.get().params["all"], True)
+
+    def test_export_download(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, self.settings(JOB_EXPORT_DIR=directory):
+            job: Job = enqueue("export_network", {"type": "ndjson"})
+            self.assertEqual(self.client.get(f"/trade_network/job/{job.pk}/download").status_code, 404)
+            self.assertEqual(self.client.get("/trade_network/job/abc/download").status_code, 404)
+            self.run_worker()
+            job.refresh_from_db()
+            self.assertEqual(job.result["lines"], 9)
+            response = self.client.get(f"/trade_network/job/{job.pk}/download")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 9)
+
+    def test_rebuild_hierarchy(self) -> None:
+        Node.objects.filter(pk=self.retailers[0].pk).update(path="/", level=0)
+        job: Job = enqueue("rebuild_hierarchy")
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"updated": 1, "in_cycles": 0})
+        self.assertEqual(Node.objects.get(pk=self.retailers[0].pk).level, 2)
+
+
+@override_settings(CHANGE_FEED_LAG_SECONDS=0)
+class ChangeFeedTest(TestCase):
+    """
+    The ChangeFeedTest class checks the modification times of members, contacts and products
+    and the change feed built on them.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="staff", is_active=True))
+        self.retailer: Node = create_chain("a")
+        self.product: Product = Product.objects.create(name="TV", model="X1", release_date="2023-01-01",
+                                                       owner=self.retailer)
+
+    def sync(self, cursor: str = "", limit: int = 100) -> dict:
+        response = self.client.get("/trade_network/changes", {"cursor": cursor, "limit": limit})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_and_incremental_sync(self) -> None:
+        first: dict = self.sync()
+        self.assertEqual((len(first["nodes"]), len(first["contacts"]), len(first["products"])), (3, 3, 1))
+        self.assertFalse(first["more"])
+
+        empty: dict = self.sync(first["cursor"])
+        self.assertEqual([empty[name] for name in ("nodes", "contacts", "products", "deleted")], [[], [], [], []])
+
+        post_transactions([{"node": self.retailer.pk, "kind": "charge", "amount": "3.00"}])
+        Contact.objects.filter(memder=self.retailer).update(city="Kazan")
+        Product.objects.filter(pk=self.product.pk).delete()
+        with self.assertNumQueries(4):
+            changes: dict = self.sync(empty["cursor"])
+        self.assertEqual([(row["id"], row["debt_to_the_supplier"]) for row in changes["nodes"]],
+                         [(self.retailer.pk, "3.00")])
+        self.assertEqual([row["city"] for row in changes["contacts"]], ["Kazan"])
+        self.assertEqual(changes["products"], [])
+        self.assertEqual([(row["kind"], row["id"]) for row in changes["deleted"]], [("product", self.product.pk)])
+
+    def test_bulk_update_in_small_pages(self) -> None:
+        cursor: str = self.sync()["cursor"]
+        Node.objects.update(level=F("level"))
+        seen: list = []
+        while True:
+            changes: dict = self.sync(cursor, limit=2)
+            seen += [row["id"] for row in changes["nodes"]]
+            cursor = changes["cursor"]
+            if not changes["more"]:
+                break
+        self.assertEqual(sorted(seen), sorted(Node.objects.values_list("id", flat=True)))
+
+    def test_cascade_tombstones_and_lag(self) -> None:
+        cursor: str = self.sync()["cursor"]
+        Node.objects.get(pk=self.retailer.pk).delete()
+        with self.settings(CHANGE_FEED_LAG_SECONDS=60):
+            self.assertEqual(self.sync(cursor)["deleted"], [])
+        deleted: list = [(row["kind"], row["id"]) for row in self.sync(cursor)["deleted"]]
+        self.assertCountEqual(deleted, [("node", self.retailer.pk), ("contact", self.retailer.contact.pk),
+                                        ("product", self.product.pk)])
+
+    def test_invalid_cursor(self) -> None:
+        self.assertEqual(self.client.get("/trade_network/changes", {"cursor": "not-a-cursor"}).status_code, 404)
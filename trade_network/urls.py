@@ -1,10 +1,27 @@
 from django.urls import path
 
-from trade_network import views
+from trade_network import async_views, views
 
 
 urlpatterns = [
     path("node", views.NodeCreateView.as_view()),
     path("node/list", views.NodeListView.as_view()),
+    path("node/import", views.NodeImportView.as_view()),
+    path("node/export", views.NodeExportView.as_view()),
+    path("node/aggregates", views.NodeAggregateView.as_view()),
+    path("node/search", views.NodeSearchView.as_view()),
     path("node/<pk>", views.NodeView.as_view()),
+    path("node/<pk>/suppliers", views.NodeSupplierChainView.as_view()),
+    path("node/<pk>/subtree", views.NodeSubtreeView.as_view()),
+    path("node/<pk>/subtree/aggregate", views.NodeSubtreeAggregateView.as_view()),
+    path("node/<pk>/ledger", views.NodeLedgerView.as_view()),
+    path("ledger", views.DebtPostingView.as_view()),
+    path("changes", views.ChangeFeedView.as_view()),
+    path("product/list", views.ProductListView.as_view()),
+    path("product/upsert", views.ProductUpsertView.as_view()),
+    path("job", views.JobCreateView.as_view()),
+    path("job/<pk>", views.JobView.as_view()),
+    path("job/<pk>/download", views.JobDownloadView.as_view()),
+    path("async/node/list", async_views.AsyncNodeListView.as_view()),
+    path("async/node/<pk>", async_views.AsyncNodeView.as_view()),
     ]
\ No newline at end of file
@@ -1,12 +1,39 @@
-from typing import List
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from django.db import models
+from django.db.models import QuerySet
+from django.conf import settings
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, serializers
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import permissions, serializers, status
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.generics import (CreateAPIView, ListAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView,
+                                     get_object_or_404)
+from rest_framework.pagination import BasePagination
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from trade_network.models import Node
-from trade_network.serializers import NodeCreateSerializer, NodeListSerializer, NodeSerializer
+from test_task_1.routers import ReplicaReadMixin
+from trade_network.aggregates import GROUPINGS, group_totals, subtree_totals
+from trade_network.cache import CachedRetrieveMixin
+from trade_network.catalog import upsert_products
+from trade_network.changes import decode_cursor, encode_cursor, read_changes
+from trade_network.export import EXPORT_FORMATS
+from trade_network.fieldsets import SparseFieldsetViewMixin
+from trade_network.filters import NodeLocationFilter, ProductFilter
+from trade_network.importer import import_nodes
+from trade_network.jobs import enqueue
+from trade_network.ledger import post_transactions
+from trade_network.models import Job, Node, Product
+from trade_network.pagination import KeysetPagination, NodeKeysetPagination, ProductKeysetPagination
+from trade_network.parsers import NDJSONParser
+from trade_network.renderers import NODE_RENDERER_CLASSES
+from trade_network.serializers import (
+    DebtTransactionSerializer, JobSerializer, NodeCreateSerializer, NodeListSerializer, NodeSerializer,
+    ProductSerializer
+)
 
 
 class NodeCreateView(CreateAPIView):
@@ -19,26 +46,376 @@ class NodeCreateView(CreateAPIView):
     serializer_class: serializers.ModelSerializer = NodeCreateSerializer
 
 
-class NodeListView(ListAPIView):
+class NodeImportView(APIView):
+    """
+    The NodeImportView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with POST methods at the address '/trade_network/node/import'.
+    Accepts a JSON array or an NDJSON stream of members with nested contacts and products.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+    parser_classes: list = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        The post function takes the request object and any positional and named arguments as parameters.
+        Imports all received rows in one transaction. Returns the number of created members and per-row errors,
+        with the 400 status if no member could be created.
+        """
+        if not isinstance(request.data, list):
+            raise ParseError("Expected a list of trading network members.")
+
+        created, errors = import_nodes(request.data)
+        response_status: int = status.HTTP_400_BAD_REQUEST if errors and not created else status.HTTP_201_CREATED
+        return Response({"created": created, "errors": errors}, status=response_status)
+
+
+class NodeExportView(APIView):
+    """
+    The NodeExportView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with GET methods at the address '/trade_network/node/export'.
+    Streams the whole trading network as NDJSON or CSV selected by the "type" query parameter.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        """
+        The get function takes the request object and any positional and named arguments as parameters.
+        Optionally filters the members by the "contact__country" query parameter. Returns a streaming response
+        that sends the first rows as soon as the database returns them.
+        """
+        export_type: str = request.query_params.get("type", "ndjson")
+        if export_type not in EXPORT_FORMATS:
+            raise ParseError(f"Unsupported export type, expected one of: {', '.join(EXPORT_FORMATS)}.")
+
+        queryset: QuerySet = Node.objects.all()
+        if "contact__country" in request.query_params:
+            queryset = queryset.filter(contact__country=request.query_params["contact__country"])
+
+        content_type, iterate = EXPORT_FORMATS[export_type]
+        response = StreamingHttpResponse(iterate(queryset), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="trade_network.{export_type}"'
+        return response
+
+
+class NodeListView(SparseFieldsetViewMixin, ReplicaReadMixin, CachedRetrieveMixin, ListAPIView):
     """
     The NodeListView class inherits from the ListAPIView class from the rest_framework.generics module
     and is a class-based view for processing requests with GET methods at the address '/trade_network/node/list'.
+    Responses are cached until the trading network changes and are read from a replica when one is configured.
     """
     model: models.Model = Node
-    queryset: List[Node] = Node.objects.all()
+    queryset: List[Node] = Node.objects.select_related("supplier", "contact")
     permission_classes: list = [permissions.IsAuthenticated]
+    throttle_scope: str = "list"
+    renderer_classes: list = NODE_RENDERER_CLASSES
     serializer_class: serializers.ModelSerializer = NodeListSerializer
     filter_backends: list = [DjangoFilterBackend,]
-    filterset_fields: List[str] = ["contact__country", ]
+    filterset_fields: Dict[str, List[str]] = {"contact__country": ["exact", "iexact"],
+                                              "contact__city": ["exact", "iexact"]}
+    keyset_pagination_class: type = NodeKeysetPagination
 
+    @property
+    def paginator(self) -> BasePagination:
+        """
+        The paginator function overrides the property of the base class. Switches the view to the keyset
+        pagination when the request contains the "pagination=cursor" or "cursor" query parameter,
+        otherwise uses the project-wide pagination class. Returns the paginator instance.
+        """
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
 
-class NodeView(RetrieveUpdateDestroyAPIView):
+
+class NodeSearchView(SparseFieldsetViewMixin, ReplicaReadMixin, ListAPIView):
+    """
+    The NodeSearchView class inherits from the ListAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address '/trade_network/node/search'.
+    Searches members by country and city with NodeLocationFilter, served from the normalized location keys.
+    """
+    model: models.Model = Node
+    queryset: QuerySet = Node.objects.select_related("supplier", "contact").order_by("-debt_to_the_supplier", "-id")
+    permission_classes: list = [permissions.IsAuthenticated]
+    throttle_scope: str = "list"
+    renderer_classes: list = NODE_RENDERER_CLASSES
+    serializer_class: serializers.ModelSerializer = NodeListSerializer
+    filter_backends: list = [DjangoFilterBackend,]
+    filterset_class: type = NodeLocationFilter
+
+
+class NodeView(SparseFieldsetViewMixin, ReplicaReadMixin, CachedRetrieveMixin, RetrieveUpdateDestroyAPIView):
     """
     The NodeView class inherits from the RetrieveUpdateDestroyAPIView class from the rest_framework.generics
     module and is a class-based view for processing requests with GET, PUT, PATCH and DELETE methods at the address
-    '/trade_network/node/<pk>'.
+    '/trade_network/node/<pk>'. GET responses are cached until the trading network changes
+    and are read from a replica when one is configured.
     """
     model: models.Model = Node
-    queryset: List[Node] = Node.objects.all()
+    queryset: List[Node] = Node.objects.select_related("supplier", "contact")
     serializer_class: serializers.ModelSerializer = NodeSerializer
     permission_classes: list = [permissions.IsAuthenticated,]
+    renderer_classes: list = NODE_RENDERER_CLASSES
+
+
+class NodeSupplierChainView(SparseFieldsetViewMixin, ListAPIView):
+    """
+    The NodeSupplierChainView class inherits from the ListAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/node/<pk>/suppliers'. Lists the whole supplier chain of the member from the top of the hierarchy.
+    """
+    model: models.Model = Node
+    permission_classes: list = [permissions.IsAuthenticated]
+    renderer_classes: list = NODE_RENDERER_CLASSES
+    serializer_class: serializers.ModelSerializer = NodeListSerializer
+    pagination_class = None
+
+    def get_queryset(self) -> QuerySet:
+        """
+        The get_queryset function overrides the method of the parent class. Returns the queryset of the suppliers
+        of the requested member resolved from its materialized path.
+        """
+        node: Node = get_object_or_404(Node.objects.only("id", "path"), pk=self.kwargs["pk"])
+        return node.get_ancestors().select_related("supplier", "contact")
+
+
+class NodeSubtreeView(SparseFieldsetViewMixin, ListAPIView):
+    """
+    The NodeSubtreeView class inherits from the ListAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/node/<pk>/subtree'. Lists all members located below the member in the hierarchy.
+    """
+    model: models.Model = Node
+    permission_classes: list = [permissions.IsAuthenticated]
+    renderer_classes: list = NODE_RENDERER_CLASSES
+    serializer_class: serializers.ModelSerializer = NodeListSerializer
+    filter_backends: list = [DjangoFilterBackend,]
+    filterset_fields: Dict[str, List[str]] = {"contact__country": ["exact", "iexact"],
+                                              "contact__city": ["exact", "iexact"]}
+
+    def get_queryset(self) -> QuerySet:
+        """
+        The get_queryset function overrides the method of the parent class. Returns the queryset of the subtree
+        of the requested member resolved by one prefix query on its materialized path.
+        """
+        node: Node = get_object_or_404(Node.objects.only("id", "path"), pk=self.kwargs["pk"])
+        return node.get_descendants().select_related("supplier", "contact").order_by("level", "id")
+
+
+class NodeAggregateView(APIView):
+    """
+    The NodeAggregateView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/node/aggregates'. Returns the number of members, their debt and products grouped
+    by the "group_by" query parameter: level, country or supplier. Accepts the optional "level",
+    "contact__country" and "root" filters, the last one limits the aggregation to the subtree of a member.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        """
+        The get function takes the request object and any positional and named arguments as parameters.
+        Validates the grouping and the filters. Returns the list of groups computed in the database.
+        """
+        params = request.query_params
+        group_by: str = params.get("group_by", "level")
+        if group_by not in GROUPINGS:
+            raise ParseError(f"Unsupported grouping, expected one of: {', '.join(GROUPINGS)}.")
+
+        nodes: QuerySet = Node.objects.all()
+        try:
+            if "level" in params:
+                nodes = nodes.filter(level=int(params["level"]))
+            if "root" in params:
+                root: Node = get_object_or_404(Node.objects.only("id", "path"), pk=int(params["root"]))
+                nodes = nodes.filter(path__startswith=root.subtree_prefix)
+        except ValueError:
+            raise ParseError("The level and root filters must be integers.")
+        if "contact__country" in params:
+            nodes = nodes.filter(contact__country=params["contact__country"])
+
+        return Response(group_totals(nodes, group_by))
+
+
+class NodeSubtreeAggregateView(APIView):
+    """
+    The NodeSubtreeAggregateView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/node/<pk>/subtree/aggregate'. Returns the roll-up of the whole downstream tree of the member.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs) -> Response:
+        """
+        The get function takes the request object, the primary key of the member and any other positional
+        and named arguments as parameters. Returns the totals of the subtree of the member.
+        """
+        node: Node = get_object_or_404(Node.objects.only("id", "path"), pk=pk)
+        return Response(subtree_totals(node))
+
+
+class DebtPostingView(APIView):
+    """
+    The DebtPostingView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with POST methods at the address '/trade_network/ledger'.
+    Accepts a JSON array or an NDJSON stream of debt postings and applies them all or none.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+    parser_classes: list = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        The post function takes the request object and any positional and named arguments as parameters.
+        Returns the number of posted entries, or the per-row errors with the 400 status.
+        """
+        if not isinstance(request.data, list):
+            raise ParseError("Expected a list of debt postings.")
+
+        posted, errors = post_transactions(request.data)
+        if errors:
+            return Response({"posted": 0, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"posted": posted, "errors": []}, status=status.HTTP_201_CREATED)
+
+
+class NodeLedgerView(ListAPIView):
+    """
+    The NodeLedgerView class inherits from the ListAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/node/<pk>/ledger'. Lists the debt ledger entries of the member in the order they were posted.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+    serializer_class: serializers.ModelSerializer = DebtTransactionSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self) -> QuerySet:
+        """
+        The get_queryset function overrides the method of the parent class. Returns the queryset
+        of the ledger entries of the requested member.
+        """
+        node: Node = get_object_or_404(Node.objects.only("id"), pk=self.kwargs["pk"])
+        return node.debt_transactions.all()
+
+
+class ChangeFeedView(APIView):
+    """
+    The ChangeFeedView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with GET methods at the address '/trade_network/changes'.
+    Returns the members, contacts and products changed and deleted since the received cursor, up to "limit"
+    rows of every kind, and the cursor of the next call. Without a cursor the feed starts from the beginning,
+    which is the initial full sync. Always read from the primary database, since a lagging replica
+    could make the cursor skip rows.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+    pagination: KeysetPagination = KeysetPagination()
+
+    def get(self, request, *args, **kwargs) -> Response:
+        """
+        The get function takes the request object and any positional and named arguments as parameters.
+        Raises a NotFound exception if the cursor is malformed. Returns the changes, the next cursor
+        and whether more changes are waiting.
+        """
+        position: Optional[dict] = decode_cursor(request.query_params.get("cursor"))
+        if position is None:
+            raise NotFound(self.pagination.invalid_cursor_message)
+        changes, more = read_changes(position, self.pagination.get_page_size(request))
+        return Response({"cursor": encode_cursor(position), "more": more, **changes})
+
+
+class ProductListView(ReplicaReadMixin, ListAPIView):
+    """
+    The ProductListView class inherits from the ListAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address '/trade_network/product/list'.
+    Filters the catalog with ProductFilter and pages it with the keyset pagination in the order selected
+    by the "ordering" query parameter. Reads from a replica when one is configured.
+    """
+    model: models.Model = Product
+    queryset: QuerySet = Product.objects.all()
+    permission_classes: list = [permissions.IsAuthenticated]
+    throttle_scope: str = "list"
+    serializer_class: serializers.ModelSerializer = ProductSerializer
+    filter_backends: list = [DjangoFilterBackend,]
+    filterset_class: type = ProductFilter
+    pagination_class = ProductKeysetPagination
+
+
+class ProductUpsertView(APIView):
+    """
+    The ProductUpsertView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with POST methods at the address
+    '/trade_network/product/upsert'. Accepts a JSON array or an NDJSON stream of catalog rows.
+    """
+    permission_classes: list = [permissions.IsAuthenticated]
+    parser_classes: list = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        The post function takes the request object and any positional and named arguments as parameters.
+        Inserts new products and updates existing ones by (owner, name, model). Returns the number of written
+        products and per-row errors, with the 400 status if no product could be written.
+        """
+        if not isinstance(request.data, list):
+            raise ParseError("Expected a list of products.")
+
+        written, errors = upsert_products(request.data)
+        response_status: int = status.HTTP_400_BAD_REQUEST if errors and not written else status.HTTP_200_OK
+        return Response({"written": written, "errors": errors}, status=response_status)
+
+
+class JobCreateView(CreateAPIView):
+    """
+    The JobCreateView class inherits from the CreateAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with POST methods at the address '/trade_network/job'.
+    Queues a background job and returns it with the 202 status at once, available to staff users only.
+    """
+    model: models.Model = Job
+    permission_classes: list = [permissions.IsAdminUser]
+    serializer_class: serializers.ModelSerializer = JobSerializer
+
+    def create(self, request, *args, **kwargs) -> Response:
+        """
+        The create function overrides the method of the parent class. It takes the request object and any
+        positional and named arguments as parameters. Validates the kind and the parameters and queues the job.
+        Returns the serialized job.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job: Job = enqueue(serializer.validated_data["kind"], serializer.validated_data.get("params"),
+                               user=request.user)
+        except ValueError as exc:
+            raise serializers.ValidationError({"kind": [str(exc)]})
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class JobView(RetrieveAPIView):
+    """
+    The JobView class inherits from the RetrieveAPIView class from the rest_framework.generics module
+    and is a class-based view for processing requests with GET methods at the address '/trade_network/job/<pk>'.
+    Shows the status, progress and outcome of a background job, available to staff users only.
+    """
+    model: models.Model = Job
+    queryset: QuerySet = Job.objects.all()
+    permission_classes: list = [permissions.IsAdminUser]
+    serializer_class: serializers.ModelSerializer = JobSerializer
+
+
+class JobDownloadView(APIView):
+    """
+    The JobDownloadView class inherits from the APIView class from the rest_framework.views module
+    and is a class-based view for processing requests with GET methods at the address
+    '/trade_network/job/<pk>/download'. Sends the file written by a finished export job.
+    """
+    permission_classes: list = [permissions.IsAdminUser]
+
+    def get(self, request, pk, *args, **kwargs) -> FileResponse:
+        """
+        The get function takes the request object, the primary key of the job and any other positional
+        and named arguments as parameters. Returns the file as an attachment or the 404 response.
+        """
+        job: Job = get_object_or_404(Job, pk=pk, kind="export_network", status=Job.SUCCEEDED)
+        path = Path(getattr(settings, "JOB_EXPORT_DIR", "exports")) / job.result["file"]
+        if not path.is_file():
+            raise Http404("The export file no longer exists.")
+        return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
@@ -0,0 +1,84 @@
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from user.models import Token, User
+
+CACHE_PREFIX: str = "user:token:"
+
+
+def get_cache():
+    """
+    The get_cache function returns the cache configured for the token lookups by the TOKEN_CACHE setting.
+    """
+    return caches[getattr(settings, "TOKEN_CACHE", "default")]
+
+
+def cached_user(user_id: int, is_active: bool) -> User:
+    """
+    The cached_user function takes as arguments the primary key of a user and its active flag kept in the cache.
+    Returns a User instance with only these fields loaded, the other fields are loaded from the database
+    when they are first used. The cache never holds the password hash or other personal data.
+    """
+    return User.from_db(None, ["id", "is_active"], [user_id, is_active])
+
+
+def forget_tokens(*digests: str) -> None:
+    """
+    The forget_tokens function takes as arguments token digests. Removes the cached users of these tokens,
+    so the next request with any of them is checked against the database.
+    """
+    get_cache().delete_many([CACHE_PREFIX + digest for digest in digests])
+
+
+class BearerTokenAuthentication(BaseAuthentication):
+    """
+    The BearerTokenAuthentication class inherits from the BaseAuthentication class from rest_framework.authentication.
+    Authenticates requests with the "Authorization: Bearer <token>" header. A token is checked by its SHA-256
+    digest without password hashing, and the primary key and the active flag of its user are kept in the cache,
+    so the hot path does not query the database. Revoking a token removes it from the cache at once. Every worker
+    sees the revocation only when TOKEN_CACHE is shared by them, which the settings require with several workers.
+    """
+    keyword: str = "Bearer"
+
+    def authenticate(self, request) -> Optional[Tuple[User, Token]]:
+        """
+        The authenticate function overrides the method of the parent class. It takes the request object
+        as a parameter. Returns None if the request has no bearer token, raises an AuthenticationFailed exception
+        if the token is malformed, unknown or belongs to an inactive user, otherwise returns the user and the token.
+        """
+        parts = get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(parts) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+        try:
+            key: str = parts[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid token header.")
+
+        digest: str = Token.make_digest(key)
+        cache = get_cache()
+        cached: Optional[Tuple[int, bool]] = cache.get(CACHE_PREFIX + digest)
+        if cached is None:
+            try:
+                cached = Token.objects.values_list("user_id", "user__is_active").get(digest=digest)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed("Invalid token.")
+            cache.set(CACHE_PREFIX + digest, tuple(cached), getattr(settings, "TOKEN_CACHE_TIMEOUT", 300))
+
+        user_id, is_active = cached
+        if not is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        user: User = cached_user(user_id, is_active)
+        return user, Token(digest=digest, user=user)
+
+    def authenticate_header(self, request) -> str:
+        """
+        The authenticate_header function overrides the method of the parent class.
+        Returns the value of the WWW-Authenticate header of the 401 responses.
+        """
+        return self.keyword
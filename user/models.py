@@ -1,4 +1,9 @@
+import hashlib
+import secrets
+from typing import Tuple
+
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 
 
 class User(AbstractUser):
@@ -7,3 +12,38 @@ class User(AbstractUser):
     This is the data model contained in the user database table.
     """
     pass
+
+
+class Token(models.Model):
+    """
+    The Token class inherits from the Model base class from the django.db.models module.
+    Stores API bearer tokens of users. Only the SHA-256 digest of a token is kept, the token itself
+    is shown to the user once when it is issued.
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    user = models.ForeignKey(User, related_name='tokens', on_delete=models.CASCADE)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        The Meta class contains the common name of the model instance in the singular and plural used
+        in the administration panel.
+        """
+        verbose_name: str = 'token'
+        verbose_name_plural: str = 'tokens'
+
+    @staticmethod
+    def make_digest(key: str) -> str:
+        """
+        The make_digest function takes as an argument a token. Returns its SHA-256 digest.
+        """
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user: User) -> Tuple['Token', str]:
+        """
+        The issue function takes as an argument an instance of the User class. Creates a new random token
+        for the user. Returns the created instance and the token itself.
+        """
+        key: str = secrets.token_urlsafe(32)
+        return cls.objects.create(digest=cls.make_digest(key), user=user), key
@@ -6,10 +6,11 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
 
+from test_task_1.metrics import TimedSerializerMixin
 from user.models import User
 
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The UserCreateSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the User class when processing
@@ -59,7 +60,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class LoginSerializer(serializers.ModelSerializer):
+class LoginSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The LoginSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the User class when processing
@@ -88,7 +89,7 @@ class LoginSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     The UserSerializer class inherits from the ModelSerializer class from rest_framework.serializers.
     This is a class for convenient serialization and deserialization of objects of the User class.
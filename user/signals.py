@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import forget_tokens
+from user.models import Token, User
+
+
+@receiver(post_delete, sender=Token)
+def forget_revoked_token(sender, instance: Token, **kwargs) -> None:
+    """
+    The forget_revoked_token function is a receiver of the post_delete signal of the Token class.
+    Removes the revoked token from the cache, so revocation takes effect on the next request.
+    """
+    forget_tokens(instance.digest)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance: User, created: bool, **kwargs) -> None:
+    """
+    The forget_user_tokens function is a receiver of the post_save signal of the User class.
+    Removes the cached copies of the user kept for its tokens, so changes such as deactivation
+    are seen on the next request.
+    """
+    if not created:
+        forget_tokens(*Token.objects.filter(user=instance).values_list("digest", flat=True))
@@ -1,3 +1,56 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from user.authentication import CACHE_PREFIX, BearerTokenAuthentication
+from user.models import Token, User
+
+
+class BearerTokenTest(TestCase):
+    """
+    The BearerTokenTest class checks issuing, using and revoking bearer tokens.
+    """
+    def setUp(self) -> None:
+        cache.clear()
+        self.user: User = User.objects.create_user(username="integration", password="Str0ng-passw0rd")
+        self.client = APIClient()
+
+    def issue(self) -> str:
+        response = self.client.post("/user/token", {"username": "integration", "password": "Str0ng-passw0rd"},
+                                    format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.data["token"]
+
+    def test_cached_lookup_skips_database(self) -> None:
+        key: str = self.issue()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {key}")
+        self.assertEqual(self.client.get("/user/profile").data["username"], "integration")
+        self.assertEqual(cache.get(CACHE_PREFIX + Token.make_digest(key)), (self.user.pk, True))
+
+        request = APIRequestFactory().get("/user/profile", HTTP_AUTHORIZATION=f"Bearer {key}")
+        with self.assertNumQueries(0):
+            user, _ = BearerTokenAuthentication().authenticate(request)
+        self.assertEqual((user.pk, user.is_active, user.is_authenticated), (self.user.pk, True, True))
+        with self.assertNumQueries(1):
+            response = self.client.get("/user/profile")
+        self.assertEqual(response.data["username"], "integration")
+
+    def test_revocation_is_immediate(self) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.issue()}")
+        self.client.get("/user/profile")
+
+        self.assertEqual(self.client.delete("/user/token/revoke").status_code, 204)
+        self.assertEqual(self.client.get("/user/profile").status_code, 401)
+        self.assertFalse(Token.objects.exists())
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.issue()}")
+        self.client.get("/user/profile")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/user/profile").status_code, 401)
+
+    def test_wrong_credentials(self) -> None:
+        response = self.client.post("/user/token", {"username": "integration", "password": "wrong"}, format="json")
+        self.assertEqual(response.status_code, 401)
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
 
-from user.views import UserCreateView, LoginView, ProfileView, UpdatePasswordView
+from user.views import UserCreateView, LoginView, ProfileView, UpdatePasswordView, TokenCreateView, TokenRevokeView
 
 urlpatterns = [
     path('signup', UserCreateView.as_view()),
     path('login', LoginView.as_view()),
+    path('token', TokenCreateView.as_view()),
+    path('token/revoke', TokenRevokeView.as_view()),
     path('profile', ProfileView.as_view()),
     path('update_password', UpdatePasswordView.as_view()),
 ]
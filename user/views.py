@@ -1,10 +1,10 @@
 from django.contrib.auth import login, logout
 from rest_framework import status
-from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, UpdateAPIView
+from rest_framework.generics import CreateAPIView, DestroyAPIView, RetrieveUpdateDestroyAPIView, UpdateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from user.models import User
+from user.models import Token, User
 from user.serializers import UserCreateSerializer, LoginSerializer, UserSerializer, UpdatePasswordSerializer
 
 
@@ -16,6 +16,7 @@ class UserCreateView(CreateAPIView):
     model = User
     serializer_class = UserCreateSerializer
     permission_classes: list = [AllowAny]
+    throttle_scope: str = "signup"
 
 class LoginView(CreateAPIView):
     """
@@ -24,6 +25,7 @@ class LoginView(CreateAPIView):
     """
     serializer_class = LoginSerializer
     permission_classes: list = [AllowAny]
+    throttle_scope: str = "login"
 
     def post(self, request, *args, **kwargs) -> Response:
         """
@@ -38,6 +40,51 @@ class LoginView(CreateAPIView):
         return Response(serializer.data)
 
 
+class TokenCreateView(CreateAPIView):
+    """
+    The TokenCreateView class inherits from the CreateAPIView class from the rest_framework.generics module and is
+    a class-based view for processing requests with POST methods at the address '/user/token'.
+    """
+    serializer_class = LoginSerializer
+    permission_classes: list = [AllowAny]
+    throttle_scope: str = "login"
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        The post function overrides the method of the parent class. Accepts the request object and any positional
+        and named arguments as parameters. If the method is called, it checks the received credentials once
+        and issues a new bearer token for the user. Returns the token, which is never shown again.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        token, key = Token.issue(user)
+        return Response({"token": key, "created": token.created}, status=status.HTTP_201_CREATED)
+
+
+class TokenRevokeView(DestroyAPIView):
+    """
+    The TokenRevokeView class inherits from the DestroyAPIView class from the rest_framework.generics module and is
+    a class-based view for processing requests with DELETE methods at the address '/user/token/revoke'.
+    """
+    permission_classes: list = [IsAuthenticated]
+
+    def delete(self, request, *args, **kwargs) -> Response:
+        """
+        The delete function overrides the method of the parent class. Accepts the request object and all other
+        positional and named arguments as parameters. If the method is called, it revokes the token used
+        for the request, or all tokens of the user with the "all" query parameter.
+        """
+        tokens = Token.objects.filter(user=request.user)
+        if request.query_params.get("all") not in ("true", "1"):
+            if not isinstance(request.auth, Token):
+                return Response({"detail": "The request is not authenticated with a token."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            tokens = tokens.filter(digest=request.auth.digest)
+        tokens.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ProfileView(RetrieveUpdateDestroyAPIView):
     """
     The ProfileView class inherits from the RetrieveUpdateDestroyAPIView class from the rest_framework.generics module
@@ -52,9 +99,13 @@ class ProfileView(RetrieveUpdateDestroyAPIView):
         """
         The get_object function overrides the method of the parent class. It does not accept arguments as parameters,
         except for the instance itself. If the method is called, it returns an instance of the User class corresponding
-        to the user who made the request.
+        to the user who made the request, loading the fields not kept by the token cache with one query.
         """
-        return self.request.user
+        user: User = self.request.user
+        deferred: set = user.get_deferred_fields()
+        if deferred:
+            user.refresh_from_db(fields=deferred)
+        return user
 
     def delete(self, request, *args, **kwargs) -> Response:
         """
@@ -74,6 +125,7 @@ class UpdatePasswordView(UpdateAPIView):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = UpdatePasswordSerializer
+    throttle_scope = "login"
 
     def get_object(self):
         """